@@ -1,6 +1,7 @@
 import random
 import pyphen
 import warnings
+from .clamping import clamp_counts
 
 
 class InversionCamouflage(object):
@@ -13,16 +14,27 @@ class InversionCamouflage(object):
     def __init__(
         self,
         seed: int = None,
+        silent_clamp: bool = False,
+        rng: random.Random = None,
     ):
         """
         Args:
             seed (int, optional): Seed for reproducible results. Defaults to None.
+            silent_clamp (bool, optional): Clamp `max_dist` to the syllables of the word without raising a warning. The clampings are
+                aggregated in `pyleetspeak.get_clamp_counts()`. Defaults to False.
+            rng (random.Random, optional): Random generator used instead of the global `random` module. If given, the seed is ignored and
+                the global random state is not modified. Defaults to None.
         """
         self.seed = seed
+        self.silent_clamp = silent_clamp
+        self.rng = rng
         # None for full random process, set seed for reproducibility in test
-        random.seed(seed) if seed else random.seed()
+        if rng is None:
+            random.seed(seed) if seed else random.seed()
 
-    def text2inversion(self, text, lang: str, max_dist: int = 2, only_max_dist_inv: bool = True):
+    def text2inversion(
+        self, text, lang: str, max_dist: int = 2, only_max_dist_inv: bool = True, rng: random.Random = None
+    ):
         """This method takes a text, separate it in syllabels, select two syllabels and invert them.
 
         The inversion output can be controlled using the max_dist and only_max_dist_inv parameters.
@@ -35,6 +47,8 @@ class InversionCamouflage(object):
         only_max_dist_inv (bool): Indicates whether you want to obtain only the inversion of max_dist or choose among
                             all inversions with the smallest possible distances up to max_dist. 
                             If True only max_dist inversion is considered for randomly selection of inversion.
+
+        rng (random.Random): Random generator of this call, used instead of the generator of the instance.
         """
 
         # Check the language exists and is available
@@ -57,16 +71,20 @@ class InversionCamouflage(object):
 
         # Check maximum distance between syllabels to be inverted make sense
         if max_dist > len(syllabels)-1:
-            warnings.warn(
-                f"""You have selected a maximum distance between syllabels ({max_dist}) for inversion greater than the maximum distance between syllables in the word ({len(syllabels)-1}). Reducing `max_dist` maximum distance between syllables.""",
-                RuntimeWarning
-            )
+            clamp_counts["inv_max_dist"] += 1
+            if not self.silent_clamp:
+                warnings.warn(
+                    f"""You have selected a maximum distance between syllabels ({max_dist}) for inversion greater than the maximum distance between syllables in the word ({len(syllabels)-1}). Reducing `max_dist` maximum distance between syllables.""",
+                    RuntimeWarning
+                )
             max_dist = len(syllabels)-1
         elif max_dist == 0:
-            warnings.warn(
-                f"""You have selected a maximum distance between syllabels ({max_dist}). No inversion will be applied""",
-                RuntimeWarning
-            )
+            clamp_counts["inv_zero_dist"] += 1
+            if not self.silent_clamp:
+                warnings.warn(
+                    f"""You have selected a maximum distance between syllabels ({max_dist}). No inversion will be applied""",
+                    RuntimeWarning
+                )
             return text
 
         # Instead of making groups with the syllabels we will work with the idxs of each syllable
@@ -90,7 +108,8 @@ class InversionCamouflage(object):
                     group_syllabels) if group_syllabels else None
 
         # Select randomly one of the groups of possible inversion
-        idxs = random.choice(all_group_syllabels)
+        rand = rng if rng is not None else self.rng if self.rng is not None else random
+        idxs = rand.choice(all_group_syllabels)
 
         # Make inversion
         syllabels[idxs[0]], syllabels[idxs[-1]
@@ -53,6 +53,9 @@ class LeetSpeaker(object):
           Get all possible leetspeak variations of the introduced text
         user_changes (Union[List, Dict]):
             Dict or List of tuples with additional changes introduced by the user.
+        rng (random.Random):
+            Random generator used instead of the global `random` module. If given, the seed is ignored
+            and the global random state is not modified.
 
     """
 
@@ -66,6 +69,7 @@ class LeetSpeaker(object):
         get_all_combs: bool = False,  # Do all combinations or not
         user_changes: list = None,
         uniform_change: bool = False,
+        rng: random.Random = None,
     ):
         # self.text_in = unidecode.unidecode(text_in)
         # self.text_out = unidecode.unidecode(text_in)
@@ -136,8 +140,10 @@ class LeetSpeaker(object):
         else:
             logger.setLevel(logging.WARNING)
 
+        self.rng = rng
         # None for full random process, set seed for reproducibility in test
-        random.seed(seed) if seed else random.seed()
+        if rng is None:
+            random.seed(seed) if seed else random.seed()
 
     def add_user_changes(self):
         """Method for combining pre-defined and user-defined substitution types
@@ -189,7 +195,7 @@ class LeetSpeaker(object):
             )
         return text
 
-    def get_all_changes_random(self, text, t1, t2):
+    def get_all_changes_random(self, text, t1, t2, rng: random.Random = None):
         """Method to apply a substitution type to the original text if a threshold is randomly exceeded using the probability of change specified.
 
         A number between [0, 1] is randomly selected. If the number selected is equal or
@@ -208,9 +214,10 @@ class LeetSpeaker(object):
         Returns:
             str: The modified original text introduced with the target term (t1) replaced by the leetspeak term (t2)
         """
+        rand = rng if rng is not None else self.rng if self.rng is not None else random
         matches_idxs = []
         matches_symbols = []
-        n = random.random()
+        n = rand.random()
         if n <= self.change_prb:
             # we dont use replace string method because is not prepared for overlapping matches
             # capturing group inside a lookahead matching overlapping patterns
@@ -220,7 +227,7 @@ class LeetSpeaker(object):
             # If uniform_change is selected, randomly select the subs chr for the same target chr
             # If there are several possible substitutions and we want to apply in all cases the same substitution
             if isinstance(t2, list) and self.uniform_change:
-                t2_choice = random.choice(t2)
+                t2_choice = rand.choice(t2)
 
             # all the matches indexes. Ignore upper or lower case
             for m in re.finditer(pattern, text, re.IGNORECASE):
@@ -229,7 +236,7 @@ class LeetSpeaker(object):
                 if isinstance(t2, list):
                     # select t2_choice randomly independent between matches for the same target chr
                     if not self.uniform_change:
-                        t2_choice = random.choice(t2)
+                        t2_choice = rand.choice(t2)
                         matches_symbols.append(t2_choice)
                     # already t2_choice was uniformingly selected
                     else:
@@ -241,7 +248,7 @@ class LeetSpeaker(object):
             if matches_idxs:
                 # Select the ceil of % of all matches according to the frequency of change specified
                 k = math.ceil(len(matches_idxs) * self.change_frq)
-                rand_lists = random.sample(
+                rand_lists = rand.sample(
                     list(zip(matches_idxs, matches_symbols)), k=k
                 )
 
@@ -411,9 +418,15 @@ class LeetSpeaker(object):
     def text2leet(
         self,
         text_in,
+        rng: random.Random = None,
     ):
         """[summary]
 
+        Args:
+            text_in (str): Text to be leetspeaked.
+            rng (random.Random, optional): Random generator of this call, used instead of the generator of the
+                instance. Defaults to None.
+
         Returns:
             [type]: [description]
         """
@@ -463,7 +476,7 @@ class LeetSpeaker(object):
             all_matches_symbols = []
             for t1, t2 in self.list_changes:
                 matches_idxs, matches_symbols = self.get_all_changes_random(
-                    text_in, t1, t2
+                    text_in, t1, t2, rng
                 )
                 all_matches_idxs.extend(matches_idxs) if matches_idxs else None
                 all_matches_symbols.extend(
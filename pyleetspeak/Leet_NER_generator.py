@@ -1,7 +1,4 @@
-import itertools
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize 
+from .resources import StopWords, get_stopwords, count_words
 
 languages_codes_nltk = {
     "es": "spanish",
@@ -38,27 +35,32 @@ languages_codes_nltk = {
 }
 import random
 from keybert import KeyBERT
-import re
 import numpy as np
-from typing import Union, List, Tuple
+from typing import Union, List, Tuple, Callable
 from codetiming import Timer
 from collections import OrderedDict
 from .LeetSpeaker import LeetSpeaker
 from .InversionCamouflage import InversionCamouflage
 from .PunctuationCamouflage import PunctuationCamouflage
+from .clamping import clamp_counts
+from .provenance import Provenance
+from .locator import get_locator, get_important_kws_matcher, select_non_overlapping
+from .embedders import get_embedder
 
 
 
 class NER_data_generator(object):
     def __init__(
         self,
-        kw_model_name: str = "AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
+        kw_model_name: Union[str, Callable] = "AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
         max_top_n: int = 5,
         seed: int = None,
-        lang: str = "en"
+        lang: str = "en",
+        silent_clamp: bool = True,
     ):
 
-        self.kw_model = KeyBERT(model=kw_model_name)
+        # "hashing", a model name, an embedding backend or a function that embeds a list of texts
+        self.kw_model = KeyBERT(model=get_embedder(kw_model_name))
         self.max_top_n = max_top_n
         self.lang = lang
         self.seed = seed
@@ -69,6 +71,7 @@ class NER_data_generator(object):
         else:
           rng = np.random.RandomState()    
         self.rng = rng
+        self.silent_clamp = silent_clamp
     
         
 
@@ -78,10 +81,13 @@ class NER_data_generator(object):
             if stop_words not in list(languages_codes_nltk.keys()):
                 raise RuntimeError(f"Language selected not available. Please select one of the follolowing: {list(languages_codes_nltk.keys())}")
             else:
-                stop_words =  stopwords.words(languages_codes_nltk[stop_words])      
+                stop_words =  get_stopwords(languages_codes_nltk[stop_words])      
+        # Custom stopwords are hashed once. Pass a `StopWords` to reuse them between calls
+        elif stop_words is not None and not isinstance(stop_words, StopWords):
+            stop_words = StopWords(stop_words)
 
         # Compute keyBERT
-        num_words = len(word_tokenize(sentence))
+        num_words = count_words(sentence)
         
         # limit the number of keywords
         if num_words < 10 : 
@@ -89,14 +95,13 @@ class NER_data_generator(object):
         else:
           n_kw = random.randint(1, self.max_top_n)
 
-        kws = self.kw_model.extract_keywords(sentence,  stop_words=stop_words, keyphrase_ngram_range=keyphrase_ngram_range, top_n=n_kw, **kwargs)
+        kws = self.kw_model.extract_keywords(sentence,  stop_words=stop_words.word_list if stop_words is not None else None, keyphrase_ngram_range=keyphrase_ngram_range, top_n=n_kw, **kwargs)
         
         
         kws = [kw for kw, sim_score in kws]
 
         if important_kws:
-          pattern = re.compile("|".join(important_kws), re.IGNORECASE)
-          important_kws_find = re.findall(pattern, sentence )
+          important_kws_find = get_important_kws_matcher(tuple(important_kws)).findall(sentence)
           [kws.append(imp_kw.lower()) for imp_kw in important_kws_find if imp_kw.lower() not in kws]
         
         return kws
@@ -111,23 +116,7 @@ class NER_data_generator(object):
     def filter_overlapping(self, ori_data):
       # Filter overlapping matches. If overlaps get the larger one
       list_idxs = [ dict_in["init_idxs"]  for dict_in in ori_data["meta"] ]
-      
-      # generate all possible combinations of 2 idxs
-      delete_overlapping_rg = []
-      for a, b in itertools.combinations(list_idxs, 2):
-          # check if they overlap
-          if self.idxs_overlap(a, b):
-            # Discar the smaller one
-            if a[1] - a[0] > b[1] - b[0]: 
-              delete_overlapping_rg.append(b)
-            else: 
-              delete_overlapping_rg.append(a)
-
-      # Get the idxs of the sublist of all matches that are not discarded
-      selected_idxs = [i for i, e in enumerate(list_idxs) if e not in delete_overlapping_rg]
-
-      # Extract only the selected matches taht do not overlap or if overlap are the larger one
-      ori_data["meta"] = [dict_in for i, dict_in in enumerate(ori_data["meta"]) if i in selected_idxs]
+      ori_data["meta"] = [ori_data["meta"][i] for i in select_non_overlapping(list_idxs)]
       return ori_data     
 
     def get_new_idxs(self, kw_in, kw_leet, ori_idx,  shift):
@@ -202,7 +191,8 @@ class NER_data_generator(object):
           uniform_change=uniform_change,
           hyphenate=hyphenate,
           lang=self.lang,
-          seed=self.seed # for reproducibility
+          seed=self.seed, # for reproducibility
+          silent_clamp=self.silent_clamp
       )  
       return punt_camo
 
@@ -217,6 +207,11 @@ class NER_data_generator(object):
       return params
 
 
+    def provenance(self, technique, params, text_in, text_out, mode=None):
+      # The transformers reseed the global random state with the seed of the generator
+      rng_type = "seed" if self.seed else None
+      return Provenance(technique, params, text_in, text_out, mode=mode, rng_type=rng_type, rng_key=self.seed or None)
+
     def apply_leetspeak(self, kw):
         
       # if kw to camouflage is <=1 return None because no change will be applied
@@ -231,65 +226,65 @@ class NER_data_generator(object):
       for m in method_tag:
         if m == "leetspeak":
           leeter = self.get_random_leetspeak()
-          params = leeter.__dict__
-
+          text_in = leet_kw
           leet_kw = leeter.text2leet(leet_kw)
           
           # Save arameters
-          all_params[m] = params
+          all_params[m] = self.provenance(m, (leeter.change_prb, leeter.change_frq, bool(leeter.uniform_change)), text_in, leet_kw, mode=str(leeter.mode))
 
         if m == "leetspeak-basic":
           leeter = self.get_random_leetspeak(mode="basic")
-          params = leeter.__dict__
-
+          text_in = leet_kw
           leet_kw = leeter.text2leet(leet_kw)
           
           # Save arameters
-          all_params[m] = params
+          all_params[m] = self.provenance(m, (leeter.change_prb, leeter.change_frq, bool(leeter.uniform_change)), text_in, leet_kw, mode=str(leeter.mode))
         
         if m == "leetspeak-covid_basic":
           leeter = self.get_random_leetspeak(mode="covid_basic")
-          params = leeter.__dict__
-
+          text_in = leet_kw
           leet_kw = leeter.text2leet(leet_kw)
           
           # Save arameters
-          all_params[m] = params
+          all_params[m] = self.provenance(m, (leeter.change_prb, leeter.change_frq, bool(leeter.uniform_change)), text_in, leet_kw, mode=str(leeter.mode))
         
         if m == "punct_camo":
           
           puntc_camo = self.get_random_punt_camo()
-          params = puntc_camo.__dict__
         
           # Other wordcamoufage process can change length of the original kw (Ex. oo --> u)
           # number of injections will be just one in that case
           if len(leet_kw) <= 1:
-            print(f"leet_kw = {leet_kw}, len = {len(leet_kw)}")
+            clamp_counts["punct_short_kw"] += 1
+            if not self.silent_clamp:
+              print(f"leet_kw = {leet_kw}, len = {len(leet_kw)}")
             n_inj = 1
           else:
             # if kw is long enough just pick a random number of injections
             n_inj = self.rng.randint(1, len(leet_kw))
             
             
-          params["n_inj"] = n_inj
-          params["text_in"] = leet_kw
-          
-
+          text_in = leet_kw
           leet_kw = puntc_camo.text2punctcamo(leet_kw, n_inj=n_inj)
           
           # Save arameters
-          params["text_out"] = leet_kw
-          all_params[m] = params      
+          all_params[m] = self.provenance(
+            m,
+            (bool(puntc_camo.word_splitting), bool(puntc_camo.uniform_change), bool(puntc_camo.hyphenate), puntc_camo.lang, int(n_inj)),
+            text_in,
+            leet_kw,
+          )
         
         if m == "inv_camo":
-          inverter = InversionCamouflage(seed=self.seed)
+          inverter = InversionCamouflage(seed=self.seed, silent_clamp=self.silent_clamp)
           params = self.get_params_inverter()
-          params["text_in"] = leet_kw
+          text_in = leet_kw
           leet_kw = inverter.text2inversion(leet_kw, lang = params["lang"], max_dist= params["max_dist"], only_max_dist_inv= params["only_max_dist_inv"])
           
           # Save arameters
-          params["text_out"] = leet_kw
-          all_params[m] = params
+          all_params[m] = self.provenance(
+            m, (params["lang"], int(params["max_dist"]), bool(params["only_max_dist_inv"])), text_in, leet_kw
+          )
 
       if len(method_tag) > 1:
         method_tag = "mix"
@@ -300,11 +295,16 @@ class NER_data_generator(object):
       return method_tag.upper(), leet_kw, all_params
 
 
-    def generate_data(self, sentence,  stop_words: Union[List[str], str]= None, keyphrase_ngram_range: Tuple[int] = (1, 1), important_kws: List[str] = None,  **kwargs):
+    def generate_data(self, sentence,  stop_words: Union[List[str], str, StopWords]= None, keyphrase_ngram_range: Tuple[int] = (1, 1), important_kws: List[str] = None, n_variants: int = None, stream: bool = False, **kwargs):
+      """Generate NER data camouflaging the keywords of a sentence.
+
+      With `n_variants`, the keywords are extracted and located once and `n_variants` camouflaged variants are
+      generated. They are returned as a list of (NER_data, ori_data) tuples, or as a generator if `stream`. With a
+      seed, the transformers reseed the global random state with the seed, so many variants repeat.
+      """
       # print("-"*80)
       # print(sentence)
         
-      NER_data = []
       if not stop_words:
         stop_words = self.lang # if not stopwords select lang stopwords
       # Compute keyBERT
@@ -314,23 +314,26 @@ class NER_data_generator(object):
       kws = [kw for kw in kws if len(kw) > 1 ]
       # print("Kws -->", kws)
 
-      ori_data = OrderedDict({"sentence": sentence, "meta": []})
-      meta_data = []
-      for kw in kws:
-        # Get original idxs of keywords
-        for m in re.finditer(rf"(?=({kw}\b))", sentence, re.IGNORECASE): 
-          dict_meta_data = {}
-          dict_meta_data["kw"] = kw
-          dict_meta_data["init_idxs"] = (m.start(1), m.end(1))
-          meta_data.append(dict_meta_data)
-      
-      # Sort keywords by occurence
-      meta_data = sorted(meta_data, key = lambda i: i['init_idxs'])
-      ori_data["meta"].extend(meta_data)
+      located = OrderedDict({"sentence": sentence, "meta": []})
+      # Get original idxs of keywords, sorted by occurence
+      meta_data = [
+        {"kw": kw, "init_idxs": (start, end)}
+        for kw, start, end in get_locator(tuple(kws)).locate(sentence)
+      ]
+      located["meta"].extend(meta_data)
   
       # Filter overlapping matches. If overlaps get the larger one
-      ori_data = self.filter_overlapping(ori_data)
-        
+      located = self.filter_overlapping(located)
+
+      if n_variants is None:
+        return self.camouflage_located(located)
+      variants = (self.camouflage_located(located) for _ in range(n_variants))
+      return variants if stream else list(variants)
+
+    def camouflage_located(self, located):
+      # Copy the located keywords, so they can be camouflaged several times
+      NER_data = []
+      ori_data = OrderedDict({"sentence": located["sentence"], "meta": [dict(m) for m in located["meta"]]})
   
       # Add LeetSpeaker info
       shift = 0
@@ -3,6 +3,7 @@ import random
 import string
 import pyphen
 import warnings
+from .clamping import clamp_counts
 
 
 class PunctuationCamouflage(object):
@@ -20,6 +21,8 @@ class PunctuationCamouflage(object):
         word_splitting: bool = False,
         punctuation: List[str] = string.punctuation + " ",
         lang: str = "es",  # "en" total of 69
+        silent_clamp: bool = False,
+        rng: random.Random = None,
     ):
         """
         Args:
@@ -29,16 +32,23 @@ class PunctuationCamouflage(object):
             word_splitting (bool, optional): Determines if the puntuation symbols should be injected in all the possible positions. The final output depends also if `hypenate` or `uniform_change` are selected. Defaults to False.
             punctuation (List[str], optional): List of puntuation symbols to use for the camouflage injection. Defaults to string.punctuation+" ".
             lang (str, optional): Language to be used in the `hyphenate` process. Defaults to "es".
+            silent_clamp (bool, optional): Clamp `n_inj` to the maximum number of injections without raising a warning. The clampings are
+                aggregated in `pyleetspeak.get_clamp_counts()`. Defaults to False.
+            rng (random.Random, optional): Random generator used instead of the global `random` module. If given, the seed is ignored and
+                the global random state is not modified. Defaults to None.
         """
         self.seed = seed
+        self.rng = rng
         # None for full random process, set seed for reproducibility in test
-        random.seed(seed) if seed else random.seed()
+        if rng is None:
+            random.seed(seed) if seed else random.seed()
 
         self.uniform_change = uniform_change
         self.hyphenate = hyphenate
         self.word_splitting = word_splitting
         self.punctuation = punctuation
         self.lang = lang
+        self.silent_clamp = silent_clamp
 
     def make_punct_injection(self, camo_text, punct_idxs, punct_symbs):
         """Method used to inject punctuation symbols at selected positions in a given text.
@@ -65,7 +75,7 @@ class PunctuationCamouflage(object):
             )
         return camo_text
 
-    def get_punct_injections(self, text, n_inj: int):
+    def get_punct_injections(self, text, n_inj: int, rng: random.Random = None):
         """Method to obtain the indexes where the punctuation symbols will be injected as well as the symbols to be injected.
 
         Args:
@@ -75,6 +85,7 @@ class PunctuationCamouflage(object):
             punct_idxs (List[int]): List of indexes where the punctuation injection wil occur
             punct_symbs (List[str]): List of punct symbols to be injected in each index
         """
+        rand = rng if rng is not None else self.rng if self.rng is not None else random
         if self.hyphenate:
             if self.lang not in pyphen.LANGUAGES.keys():
                 raise RuntimeError(
@@ -94,13 +105,15 @@ class PunctuationCamouflage(object):
                 n_inj = len(hyphen_idx)
 
             if n_inj > len(hyphen_idx):
-                warnings.warn(
-                    f"""You have selected `hyphenate` = True with a number of punctuation marks to insert ({n_inj}) greater than the maximum number of positions to hyphenate ({len(hyphen_idx)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of positions to hyphenate. """,
-                    RuntimeWarning,
-                )
+                clamp_counts["punct_hyphen_positions"] += 1
+                if not self.silent_clamp:
+                    warnings.warn(
+                        f"""You have selected `hyphenate` = True with a number of punctuation marks to insert ({n_inj}) greater than the maximum number of positions to hyphenate ({len(hyphen_idx)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of positions to hyphenate. """,
+                        RuntimeWarning,
+                    )
                 n_inj = len(hyphen_idx)
 
-            punct_idxs = random.sample(hyphen_idx, k=n_inj)
+            punct_idxs = rand.sample(hyphen_idx, k=n_inj)
 
         else:
             # if word_spliting select all the possitions to be injected
@@ -108,29 +121,33 @@ class PunctuationCamouflage(object):
                 n_inj = len(text)
 
             if n_inj > len(text):
-                warnings.warn(
-                    f"""You have selected a number of punctuation marks to insert ({n_inj}) greater than the maximum number of letters in the word ({len(text)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of positions to hyphenate. """,
-                    RuntimeWarning,
-                )
+                clamp_counts["punct_text_length"] += 1
+                if not self.silent_clamp:
+                    warnings.warn(
+                        f"""You have selected a number of punctuation marks to insert ({n_inj}) greater than the maximum number of letters in the word ({len(text)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of positions to hyphenate. """,
+                        RuntimeWarning,
+                    )
                 n_inj = len(text)
-            punct_idxs = random.sample(range(len(text)), k=n_inj)
+            punct_idxs = rand.sample(range(len(text)), k=n_inj)
 
         # Use the same punctuation symbol for all idxs to be injected
         if self.uniform_change:
             n_inj = 1
             # select one punct symbol and repeat it len(idxs) times
-            punct_symbs = list(random.sample(self.punctuation, k=n_inj)) * len(
+            punct_symbs = list(rand.sample(self.punctuation, k=n_inj)) * len(
                 punct_idxs
             )
         # Use different punctuation symbol for each idx to be injected
         else:
             if n_inj > len(self.punctuation):
-                warnings.warn(
-                    f"""You have selected a number of punctuation marks to insert ({n_inj}) greater than the maximum number of punctuation symbols ({len(self.punctuation)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of punctuation symbols. """,
-                    RuntimeWarning,
-                )
+                clamp_counts["punct_symbols"] += 1
+                if not self.silent_clamp:
+                    warnings.warn(
+                        f"""You have selected a number of punctuation marks to insert ({n_inj}) greater than the maximum number of punctuation symbols ({len(self.punctuation)}). Therefore, the number of punctuation to be inserted is reduced to the maximum number of punctuation symbols. """,
+                        RuntimeWarning,
+                    )
                 n_inj = len(self.punctuation)
-            punct_symbs = list(random.sample(self.punctuation, k=n_inj))
+            punct_symbs = list(rand.sample(self.punctuation, k=n_inj))
 
         # Sort by idxs
         punct_idxs, punct_symbs = map(
@@ -140,17 +157,18 @@ class PunctuationCamouflage(object):
 
         return punct_idxs, punct_symbs
 
-    def text2punctcamo(self, text: str, n_inj: int = 2):
+    def text2punctcamo(self, text: str, n_inj: int = 2, rng: random.Random = None):
         """Method that get the positions where the symbols will be injected as well as the symbols to be injected and apply the injection.
 
         Args:
             text (str): Input text to be punctuation camouflage
             n_inj (int): Number of punctuation injections desired. Ignored if `word_splitting` is selected. If greater than maximum injection is restricted to the maximum. Default to 2.
+            rng (random.Random, optional): Random generator of this call, used instead of the generator of the instance. Defaults to None.
 
         Returns:
             [str]: Punctuation camouflaged text
         """
-        punct_idxs, punct_symbs = self.get_punct_injections(text, n_inj)
+        punct_idxs, punct_symbs = self.get_punct_injections(text, n_inj, rng)
 
         # None if hyphen is not possible.
         if punct_idxs and punct_symbs:
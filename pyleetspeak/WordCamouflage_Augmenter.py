@@ -1,18 +1,36 @@
 from .PunctuationCamouflage import PunctuationCamouflage
 from .InversionCamouflage import InversionCamouflage
 from .LeetSpeaker import LeetSpeaker
+from .clamping import clamp_counts
+from .kw_cache import KeywordCache
+from .sampling import LegacySampler, DecisionBlock
+from .variant_pool import VariantPool
+from .tfidf_extractor import TfidfExtractor
+from .yake_pool import YakePool
+from .embedding_cache import EmbeddingCache
+from .scheduler import LengthBucketScheduler
+from .embedders import get_embedder, embedder_name
+from .pipeline import Pipeline
+from .provenance import Provenance
+from .locator import (
+    get_locator,
+    get_important_kws_matcher,
+    select_non_overlapping,
+)
 from collections import OrderedDict
 from codetiming import Timer
-from typing import Union, List, Tuple
+from typing import Union, List, Tuple, Iterable, Callable
 import numpy as np
-import re
 from keybert import KeyBERT
+from sklearn.feature_extraction.text import CountVectorizer
 import random
-import itertools
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+import multiprocessing
+import threading
+import inspect
+import zlib
+import os
 import yake
+from .resources import StopWords, get_stopwords, count_words
 
 # Create logger
 import logging
@@ -88,6 +106,22 @@ languages_codes_nltk = {
     # "sk": "slovak"
 }
 
+# Id of each step of the augmentation in the keys of the Philox random streams
+technique_ids = {
+    "keywords": 0,
+    "method": 1,
+    "leetspeak": 2,
+    "punct_camo": 3,
+    "inv_camo": 4,
+    "variant": 5,
+}
+
+# Precomputed `doc_embeddings` and `word_embeddings` are accepted by KeyBERT since keybert 0.7.0
+keybert_precomputed_embeddings = "word_embeddings" in inspect.signature(KeyBERT.extract_keywords).parameters
+
+# Flag of the sentence ids of the Philox streams used to sample the variants of the variant pool
+variant_pool_flag = 1 << 39
+
 # class Resiliance_Method(Enum):
 #         easy = ["leetspeak"],
 #         intermediate =        ["punct_camo"],
@@ -102,9 +136,9 @@ class augmenter(object):
 
     def __init__(
         self,
-        extractor_type: str,  # "yake" or "keybert",
+        extractor_type: str,  # "yake", "keybert", "tfidf" or "random"
         # KeyBERT parameters
-        kw_model_name: str = "AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
+        kw_model_name: Union[str, Callable] = "AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
         max_top_n: int = 5,
         seed: int = None,
         lang: str = "en",
@@ -135,10 +169,19 @@ class augmenter(object):
 
         return_kws: bool = False,
         verbose_level: int = 0, # 1 = INFO, 2 = DEBUG
+        silent_clamp: bool = True,
+        kw_cache: Union[str, KeywordCache] = None,
+        rng_type: str = "legacy",
+        fast_sampling: bool = False,
+        variant_pool_size: int = 0,
+        variant_cache_size: int = 10000,
+        tfidf_extractor: Union[str, TfidfExtractor] = None,
+        yake_workers: int = 0,
+        embedding_cache: Union[int, EmbeddingCache] = None,
     ):
         """
-        :param extractor_type: Type of extractor to use. "yake" or "keybert".
-        :param kw_model_name: Name of the keyword extraction model for KeyBERT. Default: AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2
+        :param extractor_type: Type of extractor to use. "yake", "keybert", "tfidf" or "random".
+        :param kw_model_name: Name of the keyword extraction model for KeyBERT. "hashing" selects the offline `HashingEmbedder` (hashed character n-grams). It also accepts an embedding backend or model supported by KeyBERT, or a function that embeds a list of texts. Default: AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2
         :param max_top_n: Maximum number of keywords to extract from the sentence. Default: 5
         :param seed: Seed for reproducibility. Default: None
         :param lang: Language of the sentence. Default: "en"
@@ -156,13 +199,27 @@ class augmenter(object):
         :param punct_prb: Probability of applying punctuation camouflage when inversion is not applied. Default: 0.25
         :param leet_basic_punt_prb: Probability of applying leetspeak or punctuation camouflage when inversion is not applied. Default: 0.15
         :param leet_covid_basic_punt_prb: Probability of applying leetspeak or punctuation camouflage when inversion is not applied. Default: 0.15
+        :param silent_clamp: Clamp the camouflage parameters that exceed the keyword limits without warnings. The clampings can be queried with `pyleetspeak.get_clamp_counts()`. Default: True
+        :param kw_cache: Path of an on-disk `KeywordCache`, or the cache itself, to store the keywords extracted by KeyBERT or YAKE and skip the extraction of sentences already seen. Default: None
+        :param rng_type: Random number generation. "legacy" uses a single random stream for the whole augmentation, so the result of a sentence depends on the sentences processed before it. "philox" uses an independent counter-based (Philox) stream for each (seed, sentence id, keyword index, technique), so any sentence can be reproduced on its own. Default: "legacy"
+        :param fast_sampling: Draw the random configuration of the camouflage techniques from pre-generated blocks of uniform numbers instead of one `RandomState.choice` call per decision, and do not reseed the global random state for each keyword. It is faster, but seeded results differ from the default sampling. Default: False
+        :param variant_pool_size: Number of camouflaged variants sampled for each keyword and camouflage techniques. Later occurrences of the keyword with the same techniques pick one of the variants instead of running the techniques again. The diversity of the camouflage is limited to this number of variants per keyword and techniques. If 0, no variants are cached. Default: 0
+        :param variant_cache_size: Maximum number of keywords whose variants are cached. The least recently used keywords are evicted. Default: 10000
+        :param tfidf_extractor: Path of a TF-IDF vocabulary saved with `TfidfExtractor.save`, or a `TfidfExtractor`, for the "tfidf" extractor. If None, a new extractor is created and it must be fitted with `fit_tfidf`. Default: None
+        :param embedding_cache: Maximum number of embeddings of an in-memory `EmbeddingCache`, or the cache itself, to store the embeddings of the sentences and candidate keywords of KeyBERT. Only the texts that are not stored are embedded by the model. It needs keybert>=0.7.0. Default: None
+        :param yake_workers: Number of processes of the pool that extracts the YAKE keywords of each batch of `transform_batch`. The pool is started the first time it is needed. If 0, the keywords are extracted in the current process. Default: 0
         """
+        # Parameters used to build a copy of the augmenter in each worker of `transform_parallel`
+        self.init_params = {k: v for k, v in locals().items() if k != "self"}
+
         self.extractor_type = extractor_type
+        # Name of the model in the keys of the caches
+        self.kw_model_name = embedder_name(kw_model_name)
         self.max_top_n = max_top_n
         self.lang = lang
 
         if self.extractor_type == "yake":
-            self.yake_extractor = yake.KeywordExtractor(
+            self.yake_params = dict(
                 lan=self.lang,
                 n=1,  # Number of words in the keyword
                 dedupLim=0.9,  # Deduplication limit
@@ -171,8 +228,19 @@ class augmenter(object):
                 top=self.max_top_n,  # Number of keywords to be returned
                 features=None,  # Features to be used for weighting the keywords.
             )
+            self.yake_extractor = yake.KeywordExtractor(**self.yake_params)
+            self.yake_workers = yake_workers
+            # Pool of YAKE processes, started the first time it is needed
+            self.yake_pool = None
+            # The YAKE extractor and pool are shared by the extraction threads of `transform_pipelined`
+            self.yake_lock = threading.Lock()
         elif self.extractor_type == "keybert":
-            self.kw_model = KeyBERT(model=kw_model_name)
+            self.kw_model = KeyBERT(model=get_embedder(kw_model_name))
+
+        elif self.extractor_type == "tfidf":
+            if isinstance(tfidf_extractor, str):
+                tfidf_extractor = TfidfExtractor.load(tfidf_extractor)
+            self.tfidf_extractor = tfidf_extractor or TfidfExtractor()
 
         elif self.extractor_type == "random":
             self.kw_model = None
@@ -202,12 +270,101 @@ class augmenter(object):
             rng = np.random.RandomState()
         self.rng = rng
 
+        if rng_type not in ["legacy", "philox"]:
+            raise RuntimeError(
+                f"Unknown rng_type: {rng_type}. Please select one of the following: ['legacy', 'philox']"
+            )
+        self.rng_type = rng_type
+        self.fast_sampling = fast_sampling
+        # Block of random decisions of `self.rng` with fast_sampling
+        self.decision_block = None
+        # Random generator of the pooled transformers with fast_sampling, so they never touch the global random
+        # state and the output does not depend on the transformers already built
+        self.py_rng = random.Random(seed)
+        # Camouflage transformers already built, keyed by their configuration
+        self.transformer_pool = {}
+        # Camouflaged variants of the most recent keywords
+        self.variant_pool = (
+            VariantPool(variant_pool_size, variant_cache_size)
+            if variant_pool_size
+            else None
+        )
+        # Key of the Philox streams, it must fit in 64 bits
+        self.philox_seed = (
+            seed if seed is not None else np.random.SeedSequence().entropy
+        ) & (2**64 - 1)
+        # Id of the next sentence transformed without an explicit `sentence_id`
+        self.sentence_counter = 0
+
         self.return_kws = return_kws
         self.verbose_level = verbose_level
+        self.silent_clamp = silent_clamp
+
+        if isinstance(kw_cache, str):
+            kw_cache = KeywordCache(kw_cache)
+        self.kw_cache = kw_cache
+
+        if isinstance(embedding_cache, int):
+            embedding_cache = EmbeddingCache(embedding_cache)
+        if embedding_cache is not None and self.extractor_type == "keybert" and not keybert_precomputed_embeddings:
+            raise RuntimeError(
+                "The embedding cache passes precomputed embeddings to KeyBERT, which needs keybert>=0.7.0. "
+                "Please upgrade keybert or set embedding_cache=None."
+            )
+        self.embedding_cache = embedding_cache
+
+    def fit_tfidf(self, sentences: List[str]):
+        """Fit the TF-IDF weights of the "tfidf" extractor over a corpus.
+
+        :param sentences: Sentences of the corpus.
+        :return: The augmenter.
+        """
+        if self.extractor_type != "tfidf":
+            raise RuntimeError(
+                f"The TF-IDF weights can only be fitted with the 'tfidf' extractor, not '{self.extractor_type}'"
+            )
+        self.tfidf_extractor.fit(sentences)
+        # The workers of `transform_parallel` use the fitted extractor
+        self.init_params["tfidf_extractor"] = self.tfidf_extractor
+        return self
 
     def get_keywords(
-        self, sentence, stop_words, keyphrase_ngram_range, important_kws, **kwargs
+        self,
+        sentence,
+        stop_words,
+        keyphrase_ngram_range,
+        important_kws,
+        sentence_id: int = 0,
+        **kwargs,
+    ):
+        return self.get_keywords_batch(
+            [sentence],
+            stop_words,
+            keyphrase_ngram_range,
+            important_kws,
+            sentence_ids=[sentence_id],
+            **kwargs,
+        )[0]
+
+    def get_keywords_batch(
+        self,
+        sentences,
+        stop_words,
+        keyphrase_ngram_range,
+        important_kws,
+        sentence_ids: List[int] = None,
+        **kwargs,
     ):
+        """Extract the keywords of several sentences with a single call to the keyword extractor.
+
+        The number of keywords of each sentence is randomly selected as in `get_keywords`. KeyBERT extracts
+        the maximum number of keywords selected in the batch for all the sentences, and each list of keywords
+        is truncated to the number of keywords selected for its sentence.
+
+        :param sentences: List of sentences.
+        :param sentence_ids: Ids of the sentences, used to select their random streams with `rng_type="philox"`. Default: None
+        :return: List with the keywords of each sentence, equally sorted as `sentences`.
+        """
         # if stopwords are not a list of stopwords, a pre-defined nltk list will be used
         if isinstance(stop_words, str):
             if stop_words not in list(languages_codes_nltk.keys()):
@@ -215,42 +372,214 @@ class augmenter(object):
                     f"Language selected not available. Please select one of the follolowing: {list(languages_codes_nltk.keys())}"
                 )
             else:
-                stop_words = stopwords.words(languages_codes_nltk[stop_words])
+                stop_words = get_stopwords(languages_codes_nltk[stop_words])
+        # Custom stopwords are hashed once for all the batch. Pass a `StopWords` to reuse them between calls
+        elif stop_words is not None and not isinstance(stop_words, StopWords):
+            stop_words = StopWords(stop_words)
+
+        # Random generator of the keyword selection of each sentence
+        if self.rng_type == "philox":
+            sentence_ids = sentence_ids or range(len(sentences))
+            for sentence_id in sentence_ids:
+                self.check_sentence_id(sentence_id)
+            rands = [
+                self.technique_rngs(sentence_id, 0, "keywords")[1]
+                for sentence_id in sentence_ids
+            ]
+        else:
+            rands = [random] * len(sentences)
+
+        # limit the number of keywords
+        n_kws = [self.get_n_kw(sentence, rand) for sentence, rand in zip(sentences, rands)]
+
+        all_kws = self.extract_keywords(
+            sentences, n_kws, stop_words, keyphrase_ngram_range, rands=rands, **kwargs
+        )
 
+        all_kws = [
+            self.add_important_kws(sentence, kws, important_kws)
+            for sentence, kws in zip(sentences, all_kws)
+        ]
+        return all_kws
+
+    def get_n_kw(self, sentence, rand: random.Random = random):
         # Compute keyBERT
-        num_words = len(word_tokenize(sentence))
+        num_words = count_words(sentence)
 
         # limit the number of keywords
         if num_words < 10:
-            n_kw = random.randint(1, 2)
+            n_kw = rand.randint(1, 2)
         else:
-            n_kw = random.randint(1, self.max_top_n)
+            n_kw = rand.randint(1, self.max_top_n)
+        return n_kw
+
+    def extract_keywords(
+        self, sentences, n_kws, stop_words, keyphrase_ngram_range, rands=None, **kwargs
+    ):
+        """Run the keyword extractor over a batch of sentences.
+
+        :param sentences: List of sentences.
+        :param n_kws: Number of keywords to extract from each sentence.
+        :param rands: Random generator of each sentence for the "random" extractor. Default: None, the global `random` module.
+        :return: List with the (keyword, score) tuples of each sentence.
+        """
+        if self.kw_cache is not None and self.extractor_type in ["keybert", "yake"]:
+            return self.extract_keywords_cached(
+                sentences, n_kws, stop_words, keyphrase_ngram_range, **kwargs
+            )
+        return self.run_extractor(
+            sentences, n_kws, stop_words, keyphrase_ngram_range, rands=rands, **kwargs
+        )
+
+    def extract_keywords_cached(
+        self, sentences, n_kws, stop_words, keyphrase_ngram_range, **kwargs
+    ):
+        # The cache stores the ranking of the `max_top_n` keywords of each sentence. The keywords
+        # are truncated afterwards to the number of keywords selected for each sentence.
+        model_name = self.kw_model_name if self.extractor_type == "keybert" else ""
+        stop_words_hash = stop_words.hash if stop_words is not None else ""
+        keys = [
+            KeywordCache.make_key(
+                sentence,
+                self.extractor_type,
+                model_name,
+                keyphrase_ngram_range,
+                stop_words_hash,
+                lang=self.lang,
+                max_top_n=self.max_top_n,
+                **kwargs,
+            )
+            for sentence in sentences
+        ]
+        found = self.kw_cache.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            missing_kws = self.run_extractor(
+                [sentences[i] for i in missing],
+                [self.max_top_n] * len(missing),
+                stop_words,
+                keyphrase_ngram_range,
+                **kwargs,
+            )
+            new_kws = {keys[i]: kws for i, kws in zip(missing, missing_kws)}
+            self.kw_cache.set_many(new_kws)
+            found.update(new_kws)
+
+        all_kws = [found[key] for key in keys]
+        if self.extractor_type == "keybert":
+            all_kws = [kws[:n_kw] for kws, n_kw in zip(all_kws, n_kws)]
+        return all_kws
 
+    def run_extractor(
+        self, sentences, n_kws, stop_words, keyphrase_ngram_range, rands=None, **kwargs
+    ):
         if self.extractor_type == "yake":
-            kws = self.yake_extractor.extract_keywords(sentence)
+            with self.yake_lock:
+                if self.yake_workers and len(sentences) > 1:
+                    if self.yake_pool is None:
+                        self.yake_pool = YakePool(self.yake_params, self.yake_workers)
+                    all_kws = self.yake_pool.extract_keywords(sentences)
+                else:
+                    all_kws = [
+                        self.yake_extractor.extract_keywords(sentence)
+                        for sentence in sentences
+                    ]
 
         elif self.extractor_type == "keybert":
-            kws = self.kw_model.extract_keywords(
-                sentence,
-                stop_words=stop_words,
+            stop_word_list = stop_words.word_list if stop_words is not None else None
+            if self.embedding_cache is not None:
+                kwargs = {
+                    **kwargs,
+                    **self.cached_embeddings(
+                        sentences, stop_word_list, keyphrase_ngram_range, **kwargs
+                    ),
+                }
+            # Over-extract the keywords of the batch and truncate them to each sentence
+            all_kws = self.kw_model.extract_keywords(
+                sentences,
+                stop_words=stop_word_list,
                 keyphrase_ngram_range=keyphrase_ngram_range,
-                top_n=n_kw,
+                top_n=max(n_kws),
                 **kwargs,
             )
-        
+            # KeyBERT flattens the output of single document batches, and returns a flat empty list when no
+            # sentence of the batch has candidate keywords (empty vocabulary)
+            if not all_kws:
+                all_kws = [[] for _ in sentences]
+            elif len(sentences) == 1:
+                all_kws = [all_kws]
+            all_kws = [kws[:n_kw] for kws, n_kw in zip(all_kws, n_kws)]
+
+        elif self.extractor_type == "tfidf":
+            # All the sentences of the batch are vectorized at once
+            all_kws = self.tfidf_extractor.extract_keywords(
+                sentences,
+                n_kws,
+                stop_words=stop_words,
+                keyphrase_ngram_range=keyphrase_ngram_range,
+            )
+
         elif self.extractor_type == "random":
             # extract random keywords
-            kws = []
-            for i in range(n_kw):
-                kw = random.choice(sentence.split())
-                kws.append((kw, 1.0))
+            all_kws = []
+            rands = rands or [random] * len(sentences)
+            for sentence, n_kw, rand in zip(sentences, n_kws, rands):
+                kws = []
+                for i in range(n_kw):
+                    kw = rand.choice(sentence.split())
+                    kws.append((kw, 1.0))
+                all_kws.append(kws)
+
+        # A missing output would drop the sentence from the batch
+        assert len(all_kws) == len(sentences)
+        return all_kws
+
+    def cached_embeddings(
+        self, sentences, stop_word_list, keyphrase_ngram_range, **kwargs
+    ):
+        """Get the embeddings of the sentences and candidate keywords of KeyBERT from the embedding cache.
+
+        The candidate keywords are the vocabulary of the batch, built with the same vectorizer as KeyBERT, so the
+        embeddings can be passed as the precomputed `doc_embeddings` and `word_embeddings` of KeyBERT.
 
-        kws = list( set(kws) )
+        :return: Dict with the `doc_embeddings` and `word_embeddings` arguments of KeyBERT, empty if the batch has no candidate keywords.
+        """
+        if "doc_embeddings" in kwargs or "word_embeddings" in kwargs:
+            return {}
+        if kwargs.get("vectorizer") is not None:
+            count = kwargs["vectorizer"].fit(sentences)
+        else:
+            try:
+                count = CountVectorizer(
+                    ngram_range=keyphrase_ngram_range,
+                    stop_words=stop_word_list,
+                    min_df=kwargs.get("min_df", 1),
+                    vocabulary=kwargs.get("candidates"),
+                ).fit(sentences)
+            except ValueError:
+                # Empty vocabulary, KeyBERT does not embed anything
+                return {}
+        words = count.get_feature_names_out().tolist()
+        embed = self.kw_model.model.embed
+        return {
+            "doc_embeddings": self.embedding_cache.get_embeddings(
+                self.kw_model_name, sentences, embed
+            ),
+            "word_embeddings": self.embedding_cache.get_embeddings(
+                self.kw_model_name, words, embed
+            ),
+        }
+
+    def add_important_kws(self, sentence, kws, important_kws):
+        # Deduplicate in a deterministic order, a set would depend on the hash seed of the process
+        kws = list(dict.fromkeys(kws))
         kws = [kw for kw, sim_score in kws]
 
         if important_kws:
-            pattern = re.compile("|".join(important_kws), re.IGNORECASE)
-            important_kws_find = re.findall(pattern, sentence)
+            important_kws_find = get_important_kws_matcher(
+                tuple(important_kws)
+            ).findall(sentence)
             [
                 kws.append(imp_kw.lower())
                 for imp_kw in important_kws_find
@@ -270,26 +599,8 @@ class augmenter(object):
     def filter_overlapping(self, ori_data):
         # Filter overlapping matches. If overlaps get the larger one
         list_idxs = [dict_in["init_idxs"] for dict_in in ori_data["meta"]]
-
-        # generate all possible combinations of 2 idxs
-        delete_overlapping_rg = []
-        for a, b in itertools.combinations(list_idxs, 2):
-            # check if they overlap
-            if self.idxs_overlap(a, b):
-                # Discar the smaller one
-                if a[1] - a[0] > b[1] - b[0]:
-                    delete_overlapping_rg.append(b)
-                else:
-                    delete_overlapping_rg.append(a)
-
-        # Get the idxs of the sublist of all matches that are not discarded
-        selected_idxs = [
-            i for i, e in enumerate(list_idxs) if e not in delete_overlapping_rg
-        ]
-
-        # Extract only the selected matches taht do not overlap or if overlap are the larger one
         ori_data["meta"] = [
-            dict_in for i, dict_in in enumerate(ori_data["meta"]) if i in selected_idxs
+            ori_data["meta"][i] for i in select_non_overlapping(list_idxs)
         ]
         return ori_data
 
@@ -322,16 +633,117 @@ class augmenter(object):
 
         return new_s
 
-    def get_random_method(self):
-        
+    def technique_rngs(self, sentence_id: int, kw_idx: int, technique: str):
+        """Get the random generators used to apply a camouflage technique to a keyword.
+
+        With `rng_type="philox"` the generators are built from a Philox key that encodes (seed, sentence id,
+        keyword index, technique), so the stream of any keyword is obtained in O(1) without replaying the
+        previous ones. With `rng_type="legacy"` the shared random state of the augmenter is returned.
+
+        :param sentence_id: Id of the sentence.
+        :param kw_idx: Index of the keyword in the sentence.
+        :param technique: Technique or step of the augmentation ("keywords", "method", "punct_camo", ...).
+        :return: NumPy generator for the parameters of the technique and Python generator for the technique itself.
+                 The Python generator is None with `rng_type="legacy"`.
+        """
+        if self.rng_type == "legacy":
+            return self.rng, None
+        key = self.technique_key(sentence_id, kw_idx, technique)
+        return np.random.RandomState(np.random.Philox(key=key)), random.Random(key)
+
+    def technique_key(self, sentence_id: int, kw_idx: int, technique: str):
+        # Philox key of (seed, sentence id, keyword index, technique). Out of range fields would alias other streams
+        if not 0 <= kw_idx < 2**16:
+            raise RuntimeError(
+                f"The keyword index must be in [0, 2**16) with rng_type='philox', got {kw_idx}. Request fewer variants."
+            )
+        if not 0 <= sentence_id < 2**40:
+            raise RuntimeError(f"The sentence id must be in [0, 2**40) with rng_type='philox', got {sentence_id}")
+        technique_id = technique_ids["leetspeak" if "leetspeak" in technique else technique]
+        return (
+            (self.philox_seed << 64) | (sentence_id << 24) | (kw_idx << 8) | technique_id
+        )
+
+    def check_sentence_id(self, sentence_id: int):
+        # The sentence ids with `variant_pool_flag` are reserved for the variant pool
+        if self.rng_type == "philox" and not 0 <= sentence_id < variant_pool_flag:
+            raise RuntimeError(f"The sentence id must be in [0, 2**39) with rng_type='philox', got {sentence_id}")
+
+    def provenance(
+        self, technique, params, text_in, text_out, kw_idx, sentence_id, mode=None
+    ):
+        """Build the provenance record of a technique applied to a keyword, with the random state needed to replay it."""
+        if self.rng_type == "philox":
+            rng_type, rng_key = "philox", self.technique_key(sentence_id, kw_idx, technique)
+        elif self.seed and not self.fast_sampling:
+            # The transformers reseed the global random state with the seed of the augmenter
+            rng_type, rng_key = "seed", self.seed
+        else:
+            rng_type, rng_key = None, None
+        return Provenance(
+            technique, params, text_in, text_out, mode=mode, rng_type=rng_type, rng_key=rng_key
+        )
+
+    def get_sampler(self, rng: np.random.RandomState = None):
+        """Get the sampler of the random decisions of the camouflage configuration.
+
+        :param rng: NumPy generator of the decisions. Default: None, the generator of the augmenter.
+        :return: `DecisionBlock` with fast_sampling, `LegacySampler` otherwise.
+        """
+        rng = self.rng if rng is None else rng
+        if not self.fast_sampling:
+            return LegacySampler(rng)
+        if rng is not self.rng:
+            # Independent stream of a single keyword (rng_type="philox"), only a few decisions are drawn
+            return DecisionBlock(rng, block_size=8)
+        if self.decision_block is None or self.decision_block.rng is not rng:
+            self.decision_block = DecisionBlock(rng)
+        return self.decision_block
+
+    def get_transformer(self, transformer_class, py_rng: random.Random = None, **config):
+        """Get a camouflage transformer from the pool of transformers, building it the first time its configuration is used.
+
+        The transformers of the pool are shared, so their random generator is passed to each call (see `transformer_rng`)
+        instead of being stored on them. The pool is not thread-safe: an augmenter must be used by one thread at a time.
+
+        :param transformer_class: `LeetSpeaker`, `PunctuationCamouflage` or `InversionCamouflage`.
+        :param py_rng: Random generator of the keyword. Default: None, the global `random` module (the random generator of the augmenter with fast_sampling).
+        :param config: Parameters of the transformer.
+        :return: The transformer. It is shared by all the keywords with the same configuration, so its attributes must be copied to be saved.
+        """
+        legacy = py_rng is None and not self.fast_sampling
+        key = (transformer_class.__name__,) + tuple(sorted(config.items()))
+        transformer = self.transformer_pool.get(key)
+        if transformer is None:
+            # Only a legacy transformer (rng=None) reseeds the global random state when it is built
+            transformer = transformer_class(seed=self.seed, rng=None if legacy else self.transformer_rng(py_rng), **config)
+            self.transformer_pool[key] = transformer
+        elif legacy:
+            # The legacy augmenter built a new transformer for each keyword, which reseeded the global random state
+            random.seed(self.seed) if self.seed else random.seed()
+        return transformer
+
+    def transformer_rng(self, py_rng: random.Random = None):
+        """Get the random generator passed to the calls of the pooled transformers.
+
+        :param py_rng: Random generator of the keyword (rng_type="philox"). Default: None.
+        :return: `py_rng`, the random generator of the augmenter with fast_sampling, or the global `random` module.
+        """
+        if py_rng is not None:
+            return py_rng
+        return self.py_rng if self.fast_sampling else random
+
+    def get_random_method(self, rng: np.random.RandomState = None):
+        sampler = self.get_sampler(rng)
+
         methods = [
                 ["basic_leetspeak"], 
                 ["intermediate_leetspeak", "punct_camo"],
                 ["advanced_leetspeak", "punct_camo", "inv_camo"]
         ]
-        method = self.rng.choice(
-                        methods, size=1, replace=False, p=[0.25, 0.5, 0.25]
-        )[0]
+        # Select the index, NumPy can not build an array from lists of different lengths
+        method_idx = sampler.choice([0.25, 0.5, 0.25])
+        method = methods[method_idx]
         
 
 #         # Probability of applyinh leetspeak or punct camouflage
@@ -365,7 +777,10 @@ class augmenter(object):
         # logging.info(f"General method: {method}")
         return method
 
-    def get_random_leetspeak(self, mode: str = None):
+    def get_random_leetspeak(
+        self, mode: str = None, rng: np.random.RandomState = None, py_rng: random.Random = None
+    ):
+        sampler = self.get_sampler(rng)
         # Randomly select parameters value
         if not mode:  # leetspeak is random with no punct camouflage
             modes = [
@@ -375,80 +790,62 @@ class augmenter(object):
                 "covid_intermediate",
                 "advanced",
             ]
-            mode = self.rng.choice(
-                modes, size=1, replace=False, p=[0.25, 0.25, 0.2, 0.2, 0.1]
-            ).squeeze()
+            mode = modes[sampler.choice([0.25, 0.25, 0.2, 0.2, 0.1])]
         
-        uniform_change = self.rng.choice(
-            [True, False],
-            size=1,
-            replace=False,
-            p=[self.leet_uniform_change, 1 - self.leet_uniform_change],
-        ).squeeze()
+        uniform_change = sampler.bernoulli(self.leet_uniform_change)
         
         # logging.info(f"Leetspeak Mode: {mode}")
-        leeter = LeetSpeaker(
+        leeter = self.get_transformer(
+            LeetSpeaker,
+            py_rng,
             change_prb=self.leet_change_prb,
             change_frq=self.leet_change_frq,
             mode=mode,
-            seed=self.seed,  # for reproducibility purposes
             get_all_combs=False,
             uniform_change=uniform_change,
         )
         return leeter
 
-    def get_random_punt_camo(self):
+    def get_random_punt_camo(
+        self, rng: np.random.RandomState = None, py_rng: random.Random = None
+    ):
+        sampler = self.get_sampler(rng)
         # Randomly select parameters value
-        hyphenate = self.rng.choice(
-            [True, False],
-            size=1,
-            replace=False,
-            p=[self.punt_hyphenate_prb, 1 - self.punt_hyphenate_prb],
-        ).squeeze()
-        uniform_change = self.rng.choice(
-            [True, False],
-            size=1,
-            replace=False,
-            p=[self.punt_uniform_change_prb, 1 - self.punt_uniform_change_prb],
-        ).squeeze()
-        word_splitting = self.rng.choice(
-            [True, False],
-            size=1,
-            replace=False,
-            p=[self.punt_word_splitting_prb, 1 - self.punt_word_splitting_prb],
-        ).squeeze()
-
-        punt_camo = PunctuationCamouflage(
+        hyphenate = sampler.bernoulli(self.punt_hyphenate_prb)
+        uniform_change = sampler.bernoulli(self.punt_uniform_change_prb)
+        word_splitting = sampler.bernoulli(self.punt_word_splitting_prb)
+
+        punt_camo = self.get_transformer(
+            PunctuationCamouflage,
+            py_rng,
             word_splitting=word_splitting,
             uniform_change=uniform_change,
             hyphenate=hyphenate,
             lang=self.lang,
-            seed=self.seed,  # for reproducibility
+            silent_clamp=self.silent_clamp,
         )
         return punt_camo
 
-    def get_params_inverter(self):
+    def get_params_inverter(self, rng: np.random.RandomState = None):
+        sampler = self.get_sampler(rng)
         # Randomly select parameters value
-        max_dist = self.rng.randint(1, self.inv_max_dist)
-        only_max_dist_inv = self.rng.choice(
-            [True, False],
-            size=1,
-            replace=False,
-            p=[self.inv_only_max_dist_prb, 1 - self.inv_only_max_dist_prb],
-        ).squeeze()
+        max_dist = sampler.randint(1, self.inv_max_dist)
+        only_max_dist_inv = sampler.bernoulli(self.inv_only_max_dist_prb)
         params = {}
         params["lang"] = self.lang
         params["max_dist"] = max_dist
         params["only_max_dist_inv"] = only_max_dist_inv
         return params
 
-    def apply_leetspeak(self, kw):
+    def apply_leetspeak(self, kw, kw_idx: int = 0, sentence_id: int = 0):
 
         # if kw to camouflage is <=1 return None because no change will be applied
         # if len(kw) <= 1:
         #   return None
+        self.check_sentence_id(sentence_id)
         if not self.method:
-            method_tag = list(self.get_random_method())
+            rng, _ = self.technique_rngs(sentence_id, kw_idx, "method")
+            method_tag = list(self.get_random_method(rng=rng))
         else:
             # Augmenter Resiliance Attacks
             # ["basic"],
@@ -457,113 +854,221 @@ class augmenter(object):
             # ["expert"]
             method_tag = self.method
         # logging.info(f"Method: {method_tag}")    
-            
+
+        if self.variant_pool is None:
+            return self.apply_methods(kw, method_tag, kw_idx, sentence_id)
+
+        key = (kw, tuple(method_tag))
+        variants = self.variant_pool.get(key)
+        if variants is None:
+            # The variants of a keyword only depend on the seed, the keyword and the techniques with rng_type="philox"
+            pool_id = variant_pool_flag | zlib.crc32(repr(key).encode("utf-8"))
+            variants = [
+                self.apply_methods(kw, method_tag, variant_idx, pool_id)
+                for variant_idx in range(self.variant_pool.pool_size)
+            ]
+            self.variant_pool.add(key, variants)
+        rng, _ = self.technique_rngs(sentence_id, kw_idx, "variant")
+        return variants[self.get_sampler(rng).randint(0, len(variants))]
+
+    def apply_methods(self, kw, method_tag, kw_idx: int = 0, sentence_id: int = 0):
+        """Apply a list of camouflage techniques to a keyword.
+
+        :param kw: Keyword to camouflage.
+        :param method_tag: Techniques applied, in order.
+        :param kw_idx: Index of the keyword in the sentence.
+        :param sentence_id: Id of the sentence.
+        :return: Tag of the techniques, camouflaged keyword and parameters of each technique.
+        """
         leet_kw = kw
         # print("Leet kw -->", leet_kw)
         all_params = {}
         for m in method_tag:
+            rng, py_rng = self.technique_rngs(sentence_id, kw_idx, m)
+            rand = self.transformer_rng(py_rng)
             if m == "leetspeak":
-                leeter = self.get_random_leetspeak()
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(rng=rng, py_rng=py_rng)
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
 
             if m == "leetspeak-basic":
-                leeter = self.get_random_leetspeak(mode="basic")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="basic", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
 
             if m == "leetspeak-covid_basic":
-                leeter = self.get_random_leetspeak(mode="covid_basic")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="covid_basic", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
             
             ######## START Resiliance #########
             if m == "basic_leetspeak":
-                leeter = self.get_random_leetspeak(mode="basic_leetspeak")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="basic_leetspeak", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
                 
             if m == "intermediate_leetspeak":
-                leeter = self.get_random_leetspeak(mode="intermediate_leetspeak")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="intermediate_leetspeak", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
                 
         
             if m == "advanced_leetspeak":
-                leeter = self.get_random_leetspeak(mode="advanced_leetspeak")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="advanced_leetspeak", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
                 
             if m == "expert_leetspeak":
-                leeter = self.get_random_leetspeak(mode="expert_leetspeak")
-                params = leeter.__dict__
-
-                leet_kw = leeter.text2leet(leet_kw)
+                leeter = self.get_random_leetspeak(
+                    mode="expert_leetspeak", rng=rng, py_rng=py_rng
+                )
+                text_in = leet_kw
+                leet_kw = leeter.text2leet(leet_kw, rng=rand)
 
                 # Save arameters
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (leeter.change_prb, leeter.change_frq, leeter.uniform_change),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                    mode=leeter.mode,
+                )
             ######## END of Resiliance #########
             if m == "punct_camo":
 
-                puntc_camo = self.get_random_punt_camo()
-                params = puntc_camo.__dict__
+                puntc_camo = self.get_random_punt_camo(rng=rng, py_rng=py_rng)
 
                 # Other wordcamoufage process can change length of the original kw (Ex. oo --> u)
                 # number of injections will be just one in that case
                 if len(leet_kw) <= 1:
-                    print(f"leet_kw = {leet_kw}, len = {len(leet_kw)}")
+                    clamp_counts["punct_short_kw"] += 1
+                    if not self.silent_clamp:
+                        print(f"leet_kw = {leet_kw}, len = {len(leet_kw)}")
                     n_inj = 1
                 else:
                     # if kw is long enough just pick a random number of injections
-                    n_inj = self.rng.randint(1, len(leet_kw))
-
-                params["n_inj"] = n_inj
-                params["text_in"] = leet_kw
+                    n_inj = self.get_sampler(rng).randint(1, len(leet_kw))
 
-                leet_kw = puntc_camo.text2punctcamo(leet_kw, n_inj=n_inj)
+                text_in = leet_kw
+                leet_kw = puntc_camo.text2punctcamo(leet_kw, n_inj=n_inj, rng=rand)
 
                 # Save arameters
-                params["text_out"] = leet_kw
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (
+                        puntc_camo.word_splitting,
+                        puntc_camo.uniform_change,
+                        puntc_camo.hyphenate,
+                        puntc_camo.lang,
+                        n_inj,
+                    ),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                )
 
             if m == "inv_camo":
-                inverter = InversionCamouflage(seed=self.seed)
-                params = self.get_params_inverter()
-                params["text_in"] = leet_kw
+                inverter = self.get_transformer(
+                    InversionCamouflage, py_rng, silent_clamp=self.silent_clamp
+                )
+                params = self.get_params_inverter(rng=rng)
+                text_in = leet_kw
                 leet_kw = inverter.text2inversion(
                     leet_kw,
                     lang=params["lang"],
                     max_dist=params["max_dist"],
                     only_max_dist_inv=params["only_max_dist_inv"],
+                    rng=rand,
                 )
 
                 # Save arameters
-                params["text_out"] = leet_kw
-                all_params[m] = params
+                all_params[m] = self.provenance(
+                    m,
+                    (params["lang"], params["max_dist"], params["only_max_dist_inv"]),
+                    text_in,
+                    leet_kw,
+                    kw_idx,
+                    sentence_id,
+                )
 
         if len(method_tag) > 1:
             method_tag = "mix"
@@ -575,46 +1080,328 @@ class augmenter(object):
     def transform(
         self,
         sentence,
-        stop_words: Union[List[str], str] = None,
+        stop_words: Union[List[str], str, StopWords] = None,
         keyphrase_ngram_range: Tuple[int] = (1, 1),
         important_kws: List[str] = None,
+        sentence_id: int = None,
+        n_variants: int = None,
+        stream: bool = False,
         **kwargs,
     ):
+        """Camouflage the keywords of a sentence.
+
+        :param sentence: Sentence to camouflage.
+        :param stop_words: Stopwords, or language of the NLTK stopwords. Default: None, the language of the augmenter.
+        :param keyphrase_ngram_range: Length, in words, of the extracted keywords. Default: (1, 1)
+        :param important_kws: Keywords (or regular expressions) always camouflaged if they appear in the sentence. Default: None
+        :param sentence_id: Id of the sentence for `rng_type="philox"`. Default: None, the next id of the augmenter.
+        :param n_variants: Number of camouflaged variants of the sentence. The keywords are extracted and located once. The variants are independent with `rng_type="philox"`. With `rng_type="legacy"` and a seed, the transformers reseed the global random state with the seed, so many variants repeat. Default: None, a single variant that is not wrapped in a list.
+        :param stream: Return the variants as a generator instead of a list. Default: False
+        :return: Camouflaged sentence (and camouflage information if `return_kws`), or a list or generator of them with `n_variants`.
+        """
         # print("-"*80)
         # print(sentence)
 
-        NER_data = []
         if not stop_words:
             stop_words = self.lang  # if not stopwords select lang stopwords
+        # Id of the random streams of the sentence with rng_type="philox"
+        if sentence_id is None:
+            sentence_id = self.sentence_counter
+        self.sentence_counter = sentence_id + 1
         # Compute keyBERT
         kws = self.get_keywords(
-            sentence, stop_words, keyphrase_ngram_range, important_kws, **kwargs
+            sentence,
+            stop_words,
+            keyphrase_ngram_range,
+            important_kws,
+            sentence_id=sentence_id,
+            **kwargs,
         )
+        if n_variants is None:
+            return self.camouflage_keywords(sentence, kws, sentence_id)
+
+        located = self.locate_keywords(sentence, kws)
+        variants = (
+            self.camouflage_located(located, sentence_id, variant)
+            for variant in range(n_variants)
+        )
+        return variants if stream else list(variants)
+
+    def transform_batch(
+        self,
+        sentences: List[str],
+        stop_words: Union[List[str], str, StopWords] = None,
+        keyphrase_ngram_range: Tuple[int] = (1, 1),
+        important_kws: List[str] = None,
+        batch_size: int = 32,
+        bucket_bounds: Tuple[int] = None,
+        **kwargs,
+    ):
+        """Apply `transform` to a list of sentences extracting the keywords of each batch of sentences
+        with a single call to the keyword extractor (one forward pass of the KeyBERT model per batch).
+
+        The random number of keywords of every sentence of the batch is selected before the camouflage of
+        the batch, so with `rng_type="legacy"` the results of a seeded augmenter differ from calling `transform`
+        sentence by sentence. With `rng_type="philox"` both give the same results.
 
+        :param sentences: List of sentences to camouflage.
+        :param batch_size: Number of sentences sent to the keyword extractor at once. Default: 32
+        :param bucket_bounds: Group the sentences in batches of sentences of similar length with these bounds of the number of words, as in `transform_stream`. Default: None, batches of consecutive sentences.
+        :return: List with the output of `transform` for each sentence.
+        """
+        if bucket_bounds is not None:
+            return list(
+                self.transform_stream(
+                    sentences,
+                    stop_words,
+                    keyphrase_ngram_range,
+                    important_kws,
+                    batch_size=batch_size,
+                    bucket_bounds=bucket_bounds,
+                    max_wait=None,
+                    **kwargs,
+                )
+            )
+        if not stop_words:
+            stop_words = self.lang  # if not stopwords select lang stopwords
+
+        results = []
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i : i + batch_size]
+            sentence_ids = list(
+                range(self.sentence_counter, self.sentence_counter + len(batch))
+            )
+            self.sentence_counter += len(batch)
+            all_kws = self.get_keywords_batch(
+                batch,
+                stop_words,
+                keyphrase_ngram_range,
+                important_kws,
+                sentence_ids=sentence_ids,
+                **kwargs,
+            )
+            for sentence, kws, sentence_id in zip(batch, all_kws, sentence_ids):
+                results.append(self.camouflage_keywords(sentence, kws, sentence_id))
+        return results
+
+    def transform_stream(
+        self,
+        sentences: Iterable[str],
+        stop_words: Union[List[str], str, StopWords] = None,
+        keyphrase_ngram_range: Tuple[int] = (1, 1),
+        important_kws: List[str] = None,
+        batch_size: int = 32,
+        bucket_bounds: Tuple[int] = (8, 16, 32, 64, 128),
+        max_wait: float = 0.1,
+        **kwargs,
+    ):
+        """Apply `transform` to a stream of sentences, extracting the keywords of batches of sentences of similar length.
+
+        The sentences are buffered in buckets by their number of words with a `LengthBucketScheduler`, and each bucket is
+        sent to the keyword extractor as a batch when it is full or its oldest sentence has waited `max_wait` seconds, so
+        the batches of KeyBERT are padded less. The outputs are returned in the input order. The padding waste and
+        batch fill of the batches are reported by `self.batch_scheduler.stats()`.
+
+        The sentence id of each sentence is its position in the stream, so with `rng_type="philox"` the results are the
+        same as `transform_batch`. With `rng_type="legacy"` they depend on the grouping of the sentences.
+
+        :param sentences: Iterable of sentences. It is consumed lazily.
+        :param batch_size: Maximum number of sentences sent to the keyword extractor at once. Default: 32
+        :param bucket_bounds: Upper bound of the number of words of the sentences of each bucket. Default: (8, 16, 32, 64, 128)
+        :param max_wait: Maximum time in seconds that a sentence waits in its bucket. If None, the buckets are dispatched when they are full. Default: 0.1
+        :return: Generator with the output of `transform` for each sentence, in the input order.
+        """
+        if not stop_words:
+            stop_words = self.lang  # if not stopwords select lang stopwords
+
+        self.batch_scheduler = LengthBucketScheduler(bucket_bounds, batch_size, max_wait)
+        first_id = self.sentence_counter
+        # Outputs of the sentences that can not be returned until the previous ones are done
+        done = {}
+        next_index = 0
+        for batch in self.batch_scheduler.schedule(sentences, count_words):
+            indexes = [index for index, _ in batch]
+            batch = [sentence for _, sentence in batch]
+            sentence_ids = [first_id + index for index in indexes]
+            self.sentence_counter = max(self.sentence_counter, max(sentence_ids) + 1)
+            all_kws = self.get_keywords_batch(
+                batch,
+                stop_words,
+                keyphrase_ngram_range,
+                important_kws,
+                sentence_ids=sentence_ids,
+                **kwargs,
+            )
+            for index, sentence, kws, sentence_id in zip(indexes, batch, all_kws, sentence_ids):
+                done[index] = self.camouflage_keywords(sentence, kws, sentence_id)
+            while next_index in done:
+                yield done.pop(next_index)
+                next_index += 1
+
+    def transform_pipelined(
+        self,
+        sentences: Iterable[str],
+        stop_words: Union[List[str], str, StopWords] = None,
+        keyphrase_ngram_range: Tuple[int] = (1, 1),
+        important_kws: List[str] = None,
+        batch_size: int = 32,
+        queue_size: int = 4,
+        extract_workers: int = 1,
+        **kwargs,
+    ):
+        """Apply `transform` to a stream of sentences, overlapping the keyword extraction, the camouflage and the consumer
+        of the outputs in a `Pipeline` of threads connected by bounded queues.
+
+        The keyword extraction of batch N+1 runs while batch N is camouflaged and the outputs of batch N-1 are consumed
+        (e.g. written to a file). At most `queue_size` batches wait between two stages, so the memory stays bounded.
+        The sentence ids are consecutive as in `transform_batch`, so with `rng_type="philox"` the results are the same
+        as `transform_batch`. With `rng_type="legacy"` the stages share the random state and seeded results are not
+        reproducible, and several extraction threads would draw the number of keywords of the sentences in any order,
+        so `extract_workers > 1` requires `rng_type="philox"`.
+
+        :param sentences: Iterable of sentences. It is consumed lazily.
+        :param batch_size: Number of sentences sent to the keyword extractor at once. Default: 32
+        :param queue_size: Maximum number of batches waiting between two stages. Default: 4
+        :param extract_workers: Number of keyword extraction threads. More than 1 requires `rng_type="philox"`. Default: 1
+        :return: Generator with the output of `transform` for each sentence, in the input order.
+        """
+        if not stop_words:
+            stop_words = self.lang  # if not stopwords select lang stopwords
+        pipeline = Pipeline(self, batch_size, queue_size, extract_workers)
+        return pipeline.run(
+            sentences, stop_words, keyphrase_ngram_range, important_kws, **kwargs
+        )
+
+    def seed_record(self, index: int, base_seed: int = None):
+        """Reset the random state of the augmenter to a state derived from (`base_seed`, `index`), so the camouflage
+        of a record does not depend on the records processed before it.
+
+        :param index: Index of the record in the corpus.
+        :param base_seed: Global seed of the corpus. Default: None, the seed of the augmenter.
+        """
+        if self.rng_type == "philox":
+            # The Philox streams are already keyed by the record index
+            if base_seed is not None:
+                self.philox_seed = base_seed & (2**64 - 1)
+            return
+        base_seed = self.seed if base_seed is None else base_seed
+        if base_seed is None:
+            return
+        record_seed = np.random.SeedSequence([base_seed, index]).generate_state(1)[0]
+        random.seed(int(record_seed))
+        self.py_rng.seed(int(record_seed))
+        self.rng = np.random.RandomState(record_seed)
+
+    def transform_record(self, sentence, index: int, base_seed: int = None, **kwargs):
+        """Apply `transform` to the record `index` of a corpus with a random state derived from (`base_seed`, `index`).
+
+        :param sentence: Sentence to camouflage.
+        :param index: Index of the record in the corpus.
+        :param base_seed: Global seed of the corpus. Default: None, the seed of the augmenter.
+        :return: The output of `transform`.
+        """
+        self.seed_record(index, base_seed)
+        return self.transform(sentence, sentence_id=index, **kwargs)
+
+    def transform_parallel(
+        self,
+        sentences: Iterable[str],
+        n_workers: int = None,
+        chunksize: int = 64,
+        start_method: str = None,
+        **kwargs,
+    ):
+        """Apply `transform` to a corpus with a pool of processes. Each worker builds its own copy of the augmenter
+        (and of the keyword extraction model) once.
+
+        The random state of each record is derived from the seed of the augmenter and the index of the record
+        (see `transform_record`), so for a seeded augmenter the output is the same whatever the number of workers.
+
+        :param sentences: Iterable of sentences. It is consumed lazily.
+        :param n_workers: Number of worker processes. If 1, the corpus is processed in the current process. Default: None, the number of CPUs.
+        :param chunksize: Number of records sent to a worker at once. Default: 64
+        :param start_method: Start method of the worker processes ("fork", "spawn", "forkserver"). Default: None, the platform default.
+        :param kwargs: Arguments of `transform` (stop_words, keyphrase_ngram_range, important_kws, ...).
+        :return: Generator with the output of `transform` for each sentence, in the input order.
+        """
+        n_workers = n_workers or os.cpu_count()
+        # Without seed, draw a global seed for the corpus so the records still get independent random states
+        if self.rng_type == "philox":
+            base_seed = self.philox_seed
+        else:
+            base_seed = self.seed if self.seed is not None else np.random.SeedSequence().entropy
+
+        if n_workers <= 1:
+            # The records reseed the augmenter, its random state is restored afterwards so later calls of `transform`
+            # continue the sequence they would have produced without this call
+            state = (
+                random.getstate(),
+                self.py_rng.getstate(),
+                self.rng,
+                self.decision_block,
+                self.sentence_counter,
+            )
+            try:
+                for index, sentence in enumerate(sentences):
+                    yield self.transform_record(sentence, index, base_seed, **kwargs)
+            finally:
+                global_state, py_rng_state, self.rng, self.decision_block, self.sentence_counter = state
+                random.setstate(global_state)
+                self.py_rng.setstate(py_rng_state)
+            return
+
+        ctx = multiprocessing.get_context(start_method)
+        with ctx.Pool(
+            n_workers,
+            initializer=init_worker,
+            initargs=(self.init_params, base_seed, kwargs),
+        ) as pool:
+            yield from pool.imap(worker_transform, enumerate(sentences), chunksize)
+
+    def camouflage_keywords(self, sentence, kws, sentence_id: int = 0):
+        return self.camouflage_located(
+            self.locate_keywords(sentence, kws), sentence_id
+        )
+
+    def locate_keywords(self, sentence, kws):
+        """Locate the non-overlapping occurrences of the keywords in the sentence.
+
+        :param sentence: Sentence to camouflage.
+        :param kws: Keywords of the sentence.
+        :return: Dict with the sentence and the keyword and indexes of each occurrence ("meta").
+        """
         # discard kws with len < 1
         kws = [kw for kw in kws if len(kw) > 1]
         # print("Kws -->", kws)
 
         ori_data = OrderedDict({"sentence": sentence, "meta": []})
-        meta_data = []
-        for kw in kws:
-            # Get original idxs of keywords
-            for m in re.finditer(rf"(?=({kw}\b))", sentence, re.IGNORECASE):
-                dict_meta_data = {}
-                dict_meta_data["kw"] = kw
-                dict_meta_data["init_idxs"] = (m.start(1), m.end(1))
-                meta_data.append(dict_meta_data)
-
-        # Sort keywords by occurence
-        meta_data = sorted(meta_data, key=lambda i: i["init_idxs"])
+        # Get original idxs of keywords, sorted by occurence
+        meta_data = [
+            {"kw": kw, "init_idxs": (start, end)}
+            for kw, start, end in get_locator(tuple(kws)).locate(sentence)
+        ]
         ori_data["meta"].extend(meta_data)
 
         # Filter overlapping matches. If overlaps get the larger one
-        ori_data = self.filter_overlapping(ori_data)
+        return self.filter_overlapping(ori_data)
+
+    def camouflage_located(self, located, sentence_id: int = 0, variant: int = 0):
+        """Camouflage the keyword occurrences found by `locate_keywords`.
+
+        :param located: Output of `locate_keywords`. It is not modified, so it can be camouflaged several times.
+        :param sentence_id: Id of the sentence.
+        :param variant: Index of the camouflaged variant of the sentence.
+        :return: Camouflaged sentence, and the camouflage information if `return_kws`.
+        """
+        ori_data = OrderedDict(
+            {"sentence": located["sentence"], "meta": [dict(m) for m in located["meta"]]}
+        )
+        # Each variant uses different keyword indexes, so the Philox streams of the variants are independent
+        kw_offset = variant * len(ori_data["meta"])
 
         # Add LeetSpeaker info
         shift = 0
-        for dict_in in ori_data["meta"]:
+        for kw_idx, dict_in in enumerate(ori_data["meta"], kw_offset):
             # Original keyword
             kw_ori = dict_in["kw"]
             ori_idx = dict_in["init_idxs"]
@@ -623,7 +1410,7 @@ class augmenter(object):
             # tag, kw_leet, all_params = ToyLeet(kw_ori)
             # apply leetspeak return None if kw_ori len is lower than 1 (min number for n_inj)
 
-            tag, kw_leet, all_params = self.apply_leetspeak(kw_ori)
+            tag, kw_leet, all_params = self.apply_leetspeak(kw_ori, kw_idx, sentence_id)
 
             # Add LeetSpeaker info
             dict_in["kw_leet"] = kw_leet
@@ -644,3 +1431,21 @@ class augmenter(object):
             return leet_sentence, ori_data 
         else:
             return leet_sentence
+
+
+# Augmenter of each worker process of `augmenter.transform_parallel`
+worker_state = {}
+
+
+def init_worker(init_params, base_seed, transform_kwargs):
+    # Worker processes can not start their own YAKE pool
+    worker_state["augmenter"] = augmenter(**{**init_params, "yake_workers": 0})
+    worker_state["base_seed"] = base_seed
+    worker_state["transform_kwargs"] = transform_kwargs
+
+
+def worker_transform(record):
+    index, sentence = record
+    return worker_state["augmenter"].transform_record(
+        sentence, index, worker_state["base_seed"], **worker_state["transform_kwargs"]
+    )
@@ -1,14 +1,53 @@
 __version__ = "0.3.9"
 __organization__ = "AIDA (http://aida.etsisi.upm.es/)"
+import importlib
 from .LeetSpeaker import LeetSpeaker
 from .PunctuationCamouflage import PunctuationCamouflage
 from .InversionCamouflage import InversionCamouflage
-from .format_converter import to_bilou_and_iob_format
-from .Leet_NER_generator import NER_data_generator
+from .clamping import get_clamp_counts, reset_clamp_counts
+from .kw_cache import KeywordCache
+from .resources import StopWords, prepare_resources, set_resource_dir
+from .streaming import augment_file, read_records
+from .provenance import Provenance, replay
 from .modes import *
-from .spacy_ner_formal_test import spacy_formal_test, plot_confusion_matrix
-from .WordCamouflage_Augmenter import augmenter
-import nltk
 
-nltk.download("stopwords")
-nltk.download("punkt")
+# Submodules that depend on KeyBERT/torch, spaCy, scikit-learn or matplotlib. They are only
+# imported the first time one of their attributes is accessed, e.g. `pyleetspeak.augmenter`.
+_lazy_attributes = {
+    "to_bilou_and_iob_format": "format_converter",
+    "NER_data_generator": "Leet_NER_generator",
+    "spacy_formal_test": "spacy_ner_formal_test",
+    "plot_confusion_matrix": "spacy_ner_formal_test",
+    "augmenter": "WordCamouflage_Augmenter",
+    "TfidfExtractor": "tfidf_extractor",
+    "HashingEmbedder": "embedders",
+    "FunctionEmbedder": "embedders",
+    "AsyncAugmenter": "aio",
+}
+_lazy_submodules = {
+    "format_converter",
+    "Leet_NER_generator",
+    "spacy_ner_formal_test",
+    "WordCamouflage_Augmenter",
+    "tfidf_extractor",
+    "embedders",
+    "aio",
+    "serve",
+    "cli",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _lazy_attributes:
+        module = importlib.import_module(f".{_lazy_attributes[name]}", __name__)
+        value = getattr(module, name)
+        # Cache the attribute so next accesses do not go through __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _lazy_submodules | set(_lazy_attributes))
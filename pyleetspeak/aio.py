@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List
+import asyncio
+
+
+class AsyncAugmenter(object):
+    """asyncio interface of an augmenter for async services.
+
+    Concurrent requests are gathered into micro-batches: the first request waits at most `max_delay` seconds for other
+    requests, and the batch (up to `max_batch_size` sentences with the same arguments) is camouflaged with
+    `transform_batch` in a single-thread executor, so the keyword extraction model never blocks the event loop and runs
+    one batch at a time. At most `max_pending` requests wait to be batched; further requests wait until there is room.
+
+    Each request can have a timeout. A request that times out or is cancelled before its batch starts is removed from
+    the batch. Once the batch is running it can not be interrupted, and the output of the request is discarded.
+
+    Cheap transformers run inline in the event loop, without executor hops: `LeetSpeaker`, `PunctuationCamouflage`,
+    `InversionCamouflage`, any function of a sentence, and augmenters with the "random" extractor.
+    """
+
+    def __init__(
+        self,
+        transformer,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        max_pending: int = 1024,
+    ):
+        """
+        Args:
+            transformer: An `augmenter`, a `LeetSpeaker`, `PunctuationCamouflage` or `InversionCamouflage`, or a
+                function that camouflages a sentence.
+            max_batch_size (int, optional): Maximum number of sentences of a micro-batch. Defaults to 32.
+            max_delay (float, optional): Maximum time in seconds that a request waits for other requests to fill a
+                micro-batch. Defaults to 0.005.
+            max_pending (int, optional): Maximum number of requests waiting to be batched. Defaults to 1024.
+        """
+        self.transformer = transformer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.inline = (
+            not hasattr(transformer, "transform_batch")
+            or getattr(transformer, "extractor_type", None) == "random"
+        )
+        # The augmenter is not thread-safe, so the batches run one by one in a single thread
+        self.executor = None
+        self.queue = None
+        self.batcher = None
+
+    async def transform_async(self, sentence: str, timeout: float = None, **kwargs):
+        """Camouflage a sentence without blocking the event loop.
+
+        Args:
+            sentence (str): Sentence to camouflage.
+            timeout (float, optional): Maximum time in seconds to wait for the output. Defaults to None, no timeout.
+            kwargs: Arguments of the camouflage (stop_words, keyphrase_ngram_range, important_kws, ...).
+
+        Returns:
+            The output of `transform` (or of the transformer) for the sentence.
+
+        Raises:
+            asyncio.TimeoutError: If the output is not ready after `timeout` seconds.
+        """
+        if self.inline:
+            return self.transform_inline(sentence, **kwargs)
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # A single deadline for the wait for room in the queue of requests and the wait for the output
+        deadline = loop.time() + timeout if timeout is not None else None
+        await asyncio.wait_for(self.queue.put((sentence, kwargs, future)), timeout)
+        return await asyncio.wait_for(future, deadline - loop.time() if deadline is not None else None)
+
+    async def transform_many_async(self, sentences: List[str], timeout: float = None, **kwargs) -> List:
+        """Camouflage several sentences concurrently. They are batched together with the other requests.
+
+        Args:
+            sentences (List[str]): Sentences to camouflage.
+            timeout (float, optional): Maximum time in seconds to wait for the output of each sentence. Defaults to None, no timeout.
+            kwargs: Arguments of the camouflage (stop_words, keyphrase_ngram_range, important_kws, ...).
+
+        Returns:
+            List: The outputs of the sentences, in the input order.
+        """
+        if self.inline:
+            return [self.transform_inline(sentence, **kwargs) for sentence in sentences]
+        return await asyncio.gather(
+            *(self.transform_async(sentence, timeout, **kwargs) for sentence in sentences)
+        )
+
+    def transform_inline(self, sentence: str, **kwargs):
+        if hasattr(self.transformer, "transform"):
+            return self.transformer.transform(sentence, **kwargs)
+        if hasattr(self.transformer, "text2leet"):
+            return self.transformer.text2leet(sentence, **kwargs)
+        if hasattr(self.transformer, "text2punctcamo"):
+            return self.transformer.text2punctcamo(sentence, **kwargs)
+        if hasattr(self.transformer, "text2inversion"):
+            return self.transformer.text2inversion(sentence, **kwargs)
+        return self.transformer(sentence, **kwargs)
+
+    def start(self):
+        # The batcher is created in the event loop of the first request
+        if self.batcher is None:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix="pyleetspeak")
+            self.queue = asyncio.Queue(self.max_pending)
+            self.batcher = asyncio.get_running_loop().create_task(self.run_batcher())
+
+    async def run_batcher(self):
+        loop = asyncio.get_running_loop()
+        requests = []
+        try:
+            while True:
+                requests = [await self.queue.get()]
+                deadline = loop.time() + self.max_delay
+                while len(requests) < self.max_batch_size:
+                    try:
+                        requests.append(
+                            await asyncio.wait_for(self.queue.get(), deadline - loop.time())
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                # Requests with different arguments go to different batches. Cancelled requests are dropped
+                groups = {}
+                for request in requests:
+                    if not request[2].done():
+                        groups.setdefault(repr(sorted(request[1].items())), []).append(request)
+                # While a batch runs, new requests accumulate in the queue for the next batch
+                for group in groups.values():
+                    await self.run_batch(group)
+        except asyncio.CancelledError:
+            # The batcher is closed, the requests taken from the queue will not be answered
+            for _, _, future in requests:
+                future.cancel()
+            raise
+
+    async def run_batch(self, requests):
+        sentences = [sentence for sentence, _, _ in requests]
+        kwargs = requests[0][1]
+        try:
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(self.transformer.transform_batch, sentences, batch_size=len(sentences), **kwargs),
+            )
+        except Exception as e:
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), output in zip(requests, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    async def close(self):
+        """Stop the batcher and the executor. Pending requests are cancelled."""
+        if self.batcher is None:
+            return
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            self.queue.get_nowait()[2].cancel()
+        self.executor.shutdown(wait=True)
+        self.batcher = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,28 @@
+from collections import Counter
+
+# Aggregated number of times a camouflage technique had to clamp a parameter (number of injections,
+# maximum inversion distance, ...) to the valid range for the text being camouflaged. The counters are
+# shared by all the instances of the process, so they summarize a whole augmentation run.
+#
+# Keys:
+#   - "punct_hyphen_positions": `n_inj` greater than the hyphenation positions of the word.
+#   - "punct_text_length": `n_inj` greater than the number of characters of the word.
+#   - "punct_symbols": `n_inj` greater than the number of punctuation symbols available.
+#   - "punct_short_kw": keyword with a single character, only one injection is possible.
+#   - "inv_max_dist": `max_dist` greater than the distance between the syllables of the word.
+#   - "inv_zero_dist": `max_dist` equal to 0, no inversion is applied.
+clamp_counts = Counter()
+
+
+def get_clamp_counts():
+    """Get how many times each parameter has been clamped since the last reset.
+
+    Returns:
+        Dict[str, int]: Number of clamps for each kind of clamping.
+    """
+    return dict(clamp_counts)
+
+
+def reset_clamp_counts():
+    """Reset the aggregated clamping counters."""
+    clamp_counts.clear()
@@ -0,0 +1,418 @@
+"""Command line tool of pyleetspeak.
+
+Each subcommand reads line-delimited input from files (or stdin) and streams one output line per input line to stdout:
+
+    cat sentences.txt | pyleetspeak leet --mode covid_basic --seed 21 > leet.txt
+    pyleetspeak augment sentences.txt.gz --extractor yake --workers 8 | gzip > augmented.txt.gz
+    pyleetspeak ner sentences.txt --seed 21 | pyleetspeak bilou > ner.tsv
+
+The input is read in batches of `--batch-size` lines, and at most two batches per worker are in flight, so the memory
+is constant whatever the size of the input. The random state of each line is derived from the seed and the line number,
+so a seeded run gives the same output whatever the number of workers and the batch size.
+"""
+from collections import deque
+from typing import Iterable, Iterator, List, Tuple
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import sys
+import numpy as np
+from .streaming import is_gzip, to_json
+
+leet_modes = [
+    "basic",
+    "intermediate",
+    "advanced",
+    "covid_basic",
+    "covid_intermediate",
+    "basic_leetspeak",
+    "intermediate_leetspeak",
+    "advanced_leetspeak",
+    "expert_leetspeak",
+]
+
+# Camouflage techniques of `augmenter(method=...)`
+augment_techniques = [
+    "leetspeak",
+    "leetspeak-basic",
+    "leetspeak-covid_basic",
+    "basic_leetspeak",
+    "intermediate_leetspeak",
+    "advanced_leetspeak",
+    "expert_leetspeak",
+    "punct_camo",
+    "inv_camo",
+]
+
+
+def record_seed(base_seed: int, index: int) -> int:
+    # Same derivation as `augmenter.seed_record`
+    return int(np.random.SeedSequence([base_seed, index]).generate_state(1)[0])
+
+
+def split_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+def techniques(value: str) -> List[str]:
+    # Comma-separated camouflage techniques of `augment --mode`
+    method = split_list(value)
+    unknown = [technique for technique in method or [] if technique not in augment_techniques]
+    if not method or unknown:
+        raise argparse.ArgumentTypeError(f"Unknown techniques {unknown}. Please select from {augment_techniques}")
+    return method
+
+
+def read_lines(paths: List[str]) -> Iterator[str]:
+    """Lazily read the lines of the files ("-" for stdin, ".gz" files are decompressed), without the line break."""
+    for path in paths or ["-"]:
+        if path == "-":
+            f = sys.stdin
+        elif is_gzip(path):
+            f = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            f = open(path, encoding="utf-8")
+        try:
+            for line in f:
+                yield line.rstrip("\r\n")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def batches(lines: Iterable[str], batch_size: int) -> Iterator[Tuple[int, List[str]]]:
+    # Batches of lines with the number of their first line
+    batch = []
+    start = 0
+    for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            yield start, batch
+            start += len(batch)
+            batch = []
+    if batch:
+        yield start, batch
+
+
+########################## Commands ##########################
+# Each command has a `build` function, run once per worker, and a `transform` function that maps a batch of input
+# lines to output lines.
+
+
+def build_leet(args):
+    from .LeetSpeaker import LeetSpeaker
+
+    rng = random.Random()
+    return rng, LeetSpeaker(
+        mode=args.mode,
+        change_prb=args.change_prb,
+        change_frq=args.change_frq,
+        uniform_change=args.uniform_change,
+        rng=rng,
+    )
+
+
+def transform_leet(state, args, lines, start):
+    rng, leet_speaker = state
+    outputs = []
+    for index, line in enumerate(lines, start):
+        rng.seed(record_seed(args.seed, index))
+        outputs.append(leet_speaker.text2leet(line) if line.strip() else line)
+    return outputs
+
+
+def build_punct(args):
+    from .PunctuationCamouflage import PunctuationCamouflage
+
+    rng = random.Random()
+    return rng, PunctuationCamouflage(
+        uniform_change=args.uniform_change,
+        hyphenate=args.hyphenate,
+        word_splitting=args.word_splitting,
+        lang=args.lang,
+        silent_clamp=True,
+        rng=rng,
+    )
+
+
+def transform_punct(state, args, lines, start):
+    rng, punct_camo = state
+    outputs = []
+    for index, line in enumerate(lines, start):
+        rng.seed(record_seed(args.seed, index))
+        outputs.append(punct_camo.text2punctcamo(line, n_inj=args.n_inj) if line.strip() else line)
+    return outputs
+
+
+def build_invert(args):
+    from .InversionCamouflage import InversionCamouflage
+
+    rng = random.Random()
+    return rng, InversionCamouflage(silent_clamp=True, rng=rng)
+
+
+def transform_invert(state, args, lines, start):
+    rng, inv_camo = state
+    outputs = []
+    for index, line in enumerate(lines, start):
+        rng.seed(record_seed(args.seed, index))
+        if line.strip():
+            line = inv_camo.text2inversion(
+                line, lang=args.lang, max_dist=args.max_dist, only_max_dist_inv=not args.all_dists
+            )
+        outputs.append(line)
+    return outputs
+
+
+def extraction_kwargs(args):
+    return dict(
+        stop_words=split_list(args.stop_words) or args.lang,
+        keyphrase_ngram_range=(1, args.max_ngram),
+        important_kws=split_list(args.important_kws),
+    )
+
+
+def build_augment(args):
+    from .WordCamouflage_Augmenter import augmenter
+
+    return augmenter(
+        extractor_type=args.extractor,
+        kw_model_name=args.kw_model_name,
+        max_top_n=args.max_top_n,
+        seed=args.seed,
+        lang=args.lang,
+        method=args.mode,
+        rng_type=args.rng_type,
+        tfidf_extractor=args.tfidf_extractor,
+    )
+
+
+def transform_augment(aug, args, lines, start):
+    kwargs = extraction_kwargs(args)
+    outputs = list(lines)
+    indexes = [i for i, line in enumerate(lines) if line.strip()]
+    sentences = [lines[i] for i in indexes]
+    if aug.rng_type == "philox":
+        # The keywords of the batch are extracted at once. The Philox streams are keyed by the line number
+        all_kws = aug.get_keywords_batch(
+            sentences,
+            kwargs["stop_words"],
+            kwargs["keyphrase_ngram_range"],
+            kwargs["important_kws"],
+            sentence_ids=[start + i for i in indexes],
+        )
+        for i, sentence, kws in zip(indexes, sentences, all_kws):
+            outputs[i] = aug.camouflage_keywords(sentence, kws, start + i)
+    else:
+        for i, sentence in zip(indexes, sentences):
+            outputs[i] = aug.transform_record(sentence, start + i, args.seed, **kwargs)
+    return outputs
+
+
+def build_ner(args):
+    from .Leet_NER_generator import NER_data_generator
+
+    return NER_data_generator(
+        kw_model_name=args.kw_model_name, max_top_n=args.max_top_n, seed=args.seed, lang=args.lang
+    )
+
+
+def transform_ner(generator, args, lines, start):
+    kwargs = extraction_kwargs(args)
+    outputs = []
+    for index, line in enumerate(lines, start):
+        record = {"text": line, "leet_sentence": line, "entities": []}
+        if line.strip():
+            seed = record_seed(args.seed, index)
+            random.seed(seed)
+            generator.rng = np.random.RandomState(seed)
+            NER_data, ori_data = generator.generate_data(line, **kwargs)
+            leet_sentence, annotations = NER_data[0]
+            record.update(leet_sentence=leet_sentence, entities=annotations["entities"], meta=ori_data["meta"])
+        outputs.append(json.dumps(record, ensure_ascii=False, default=to_json))
+    return outputs
+
+
+def build_bilou(args):
+    from .format_converter import get_blank_nlp
+
+    return get_blank_nlp(args.lang)
+
+
+def transform_bilou(nlp, args, lines, start):
+    from .format_converter import get_bilou_and_iob_tags
+
+    rows = []
+    for index, line in enumerate(lines, start):
+        if not line.strip():
+            continue
+        # Output of `pyleetspeak ner`, or a (text, {"entities": ...}) pair as in `NER_data_generator.generate_data`
+        record = json.loads(line)
+        if isinstance(record, dict):
+            text, entities = record["leet_sentence"], record["entities"]
+        else:
+            text, entities = record[0], record[1]["entities"]
+        tokens, BILUO_tags, IOB_tags = get_bilou_and_iob_tags(nlp, text, [tuple(entity) for entity in entities])
+        for token, BILUO_tag, IOB_tag in zip(tokens, BILUO_tags, IOB_tags):
+            tags = {"biluo": [BILUO_tag], "iob": [IOB_tag], "both": [BILUO_tag, IOB_tag]}[args.mode]
+            rows.append("\t".join([str(index), token] + tags))
+    return rows
+
+
+commands = {
+    "leet": (build_leet, transform_leet),
+    "punct": (build_punct, transform_punct),
+    "invert": (build_invert, transform_invert),
+    "augment": (build_augment, transform_augment),
+    "ner": (build_ner, transform_ner),
+    "bilou": (build_bilou, transform_bilou),
+}
+
+########################## Workers ##########################
+
+# Command, arguments and state of the command in each worker process
+worker_state = None
+
+
+def init_worker(args):
+    global worker_state
+    worker_state = (args, commands[args.command][0](args))
+
+
+def worker_transform(batch):
+    args, state = worker_state
+    start, lines = batch
+    return commands[args.command][1](state, args, lines, start)
+
+
+def transform_lines(args, lines: Iterable[str]) -> Iterator[List[str]]:
+    """Apply the command of the arguments to a stream of lines.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments of the command.
+        lines (Iterable[str]): Input lines. They are consumed lazily.
+
+    Yields:
+        List[str]: Output lines of each batch, in the input order.
+    """
+    if args.workers <= 1:
+        build, transform = commands[args.command]
+        state = build(args)
+        for start, batch in batches(lines, args.batch_size):
+            yield transform(state, args, batch, start)
+        return
+
+    # `Pool.imap` would read the whole input ahead, so at most two batches per worker are submitted at once
+    with multiprocessing.get_context().Pool(args.workers, initializer=init_worker, initargs=(args,)) as pool:
+        pending = deque()
+        for batch in batches(lines, args.batch_size):
+            pending.append(pool.apply_async(worker_transform, (batch,)))
+            if len(pending) >= 2 * args.workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+########################## Arguments ##########################
+
+
+def get_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="*", help='Input files, one sentence per line. "-" or none for stdin.')
+    common.add_argument("--workers", type=int, default=1, help="Number of worker processes. Default: 1")
+    common.add_argument("--batch-size", type=int, default=64, help="Number of lines processed at once. Default: 64")
+    common.add_argument("--seed", type=int, default=None, help="Seed for reproducible results. Default: None")
+
+    extraction = argparse.ArgumentParser(add_help=False)
+    extraction.add_argument(
+        "--kw-model-name",
+        default="AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
+        help='KeyBERT model, "hashing" for the offline backend.',
+    )
+    extraction.add_argument("--max-top-n", type=int, default=5, help="Maximum number of keywords per sentence. Default: 5")
+    extraction.add_argument("--lang", default="en", help="Language of the stopwords. Default: en")
+    extraction.add_argument("--stop-words", default=None, help="Comma-separated stopwords. Default: the stopwords of --lang")
+    extraction.add_argument("--important-kws", default=None, help="Comma-separated keywords always camouflaged.")
+    extraction.add_argument("--max-ngram", type=int, default=1, help="Maximum number of words of a keyword. Default: 1")
+
+    # The subcommands without modes accept --mode, so scripts can pass the same options to all the subcommands
+    no_mode = argparse.ArgumentParser(add_help=False)
+    no_mode.add_argument("--mode", default=None, help="Ignored, this subcommand has no modes.")
+
+    parser = argparse.ArgumentParser(prog="pyleetspeak", description="Word camouflage of line-delimited text.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    leet = subparsers.add_parser("leet", parents=[common], help="Leetspeak of each line.")
+    leet.add_argument("--mode", default="basic", choices=leet_modes, help="Leetspeak mode. Default: basic")
+    leet.add_argument("--change-prb", type=float, default=0.8, help="Probability of each substitution type. Default: 0.8")
+    leet.add_argument("--change-frq", type=float, default=0.5, help="Frequency of each substitution. Default: 0.5")
+    leet.add_argument("--uniform-change", action="store_true", help="Use the same character for each substitution type.")
+
+    punct = subparsers.add_parser("punct", parents=[common, no_mode], help="Punctuation camouflage of each line.")
+    punct.add_argument("--n-inj", type=int, default=2, help="Number of punctuation injections. Default: 2")
+    punct.add_argument("--hyphenate", action="store_true", help="Inject the punctuation in the hyphenation points.")
+    punct.add_argument("--word-splitting", action="store_true", help="Inject the punctuation in all the positions.")
+    punct.add_argument("--uniform-change", action="store_true", help="Use the same punctuation symbol in all positions.")
+    punct.add_argument("--lang", default="en", help="Language of the hyphenation. Default: en")
+
+    invert = subparsers.add_parser("invert", parents=[common, no_mode], help="Syllable inversion of each line.")
+    invert.add_argument("--max-dist", type=int, default=2, help="Maximum distance of the inverted syllables. Default: 2")
+    invert.add_argument("--all-dists", action="store_true", help="Allow inversions closer than --max-dist.")
+    invert.add_argument("--lang", default="en", help="Language of the syllables. Default: en")
+
+    augment = subparsers.add_parser("augment", parents=[common, extraction], help="Camouflage of the keywords of each line.")
+    augment.add_argument(
+        "--extractor", default="keybert", choices=["keybert", "yake", "tfidf", "random"], help="Keyword extractor. Default: keybert"
+    )
+    augment.add_argument(
+        "--mode",
+        default=None,
+        type=techniques,
+        help=f"Comma-separated camouflage techniques applied to each keyword, in order, from {augment_techniques}. "
+        "Default: random techniques per keyword",
+    )
+    augment.add_argument(
+        "--rng-type",
+        default="philox",
+        choices=["legacy", "philox"],
+        help="Random state. philox extracts the keywords of each batch at once. Default: philox",
+    )
+    augment.add_argument("--tfidf-extractor", default=None, help="Fitted TF-IDF extractor for --extractor tfidf.")
+
+    subparsers.add_parser(
+        "ner",
+        parents=[common, extraction, no_mode],
+        help="NER data of each line, as JSON lines with the entities. The camouflage techniques are random per keyword.",
+    )
+
+    bilou = subparsers.add_parser(
+        "bilou", parents=[common], help="Tokens and BILOU/IOB tags of the JSON lines of `pyleetspeak ner`, as TSV."
+    )
+    bilou.add_argument("--mode", default="both", choices=["biluo", "iob", "both"], help="Tags of the output. Default: both")
+    bilou.add_argument("--lang", default="en", help="Language of the tokenizer. Default: en")
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    # Without seed, a seed is drawn for the run so each line still gets an independent random state
+    if args.seed is None:
+        args.seed = random.SystemRandom().randrange(2**32)
+    try:
+        for outputs in transform_lines(args, read_lines(args.inputs)):
+            sys.stdout.write("".join(output + "\n" for output in outputs))
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader of the output exited (e.g. `| head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+from typing import Callable, List, Tuple, Union
+import numpy as np
+from keybert.backend import BaseEmbedder
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Name of the model of `HashingEmbedder`, accepted wherever a KeyBERT model name is expected
+HASHING_MODEL_NAME = "hashing"
+
+
+class HashingEmbedder(BaseEmbedder):
+    """Offline KeyBERT embedding backend based on hashed character n-grams.
+
+    The documents and candidate keywords are embedded as L2 normalized counts of their character n-grams, hashed in
+    `n_features` dimensions. It needs no model download nor GPU, and embedding is a sparse vectorization, at a fraction
+    of the latency of a sentence-transformer. The similarity is lexical, not semantic: the keywords are the words that
+    share more n-grams with the whole sentence.
+    """
+
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 4), n_features: int = 2**12):
+        """
+        Args:
+            ngram_range (Tuple[int, int], optional): Length of the character n-grams. Defaults to (2, 4).
+            n_features (int, optional): Number of dimensions of the embeddings. Defaults to 2**12.
+        """
+        super().__init__()
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=ngram_range,
+            n_features=n_features,
+            alternate_sign=False,
+        )
+        self.name = f"{HASHING_MODEL_NAME}-{ngram_range[0]}-{ngram_range[1]}-{n_features}"
+
+    def embed(self, documents: List[str], verbose: bool = False) -> np.ndarray:
+        return self.vectorizer.transform(documents).toarray().astype(np.float32)
+
+
+class FunctionEmbedder(BaseEmbedder):
+    """KeyBERT embedding backend that calls a user function."""
+
+    def __init__(self, embed_function: Callable[[List[str]], np.ndarray], name: str = None):
+        """
+        Args:
+            embed_function (Callable[[List[str]], np.ndarray]): Function that embeds a list of texts, one row per text.
+            name (str, optional): Name of the model, used in the keys of the caches. Defaults to None, the name of the function.
+        """
+        super().__init__()
+        self.embed_function = embed_function
+        self.name = name or getattr(embed_function, "__name__", type(embed_function).__name__)
+
+    def embed(self, documents: List[str], verbose: bool = False) -> np.ndarray:
+        return np.asarray(self.embed_function(list(documents)))
+
+
+def get_embedder(model: Union[str, BaseEmbedder, Callable]):
+    """Get the KeyBERT model of a model name, embedding backend or embedding function.
+
+    Args:
+        model (Union[str, BaseEmbedder, Callable]): "hashing" for a `HashingEmbedder`, a model name or model object
+            supported by KeyBERT (e.g. a sentence-transformer), or a function that embeds a list of texts.
+
+    Returns:
+        Union[str, BaseEmbedder]: Model accepted by `KeyBERT(model=...)`.
+    """
+    if isinstance(model, str):
+        return HashingEmbedder() if model == HASHING_MODEL_NAME else model
+    # Model objects supported by KeyBERT (e.g. sentence-transformers are callable, but they have `encode`)
+    if isinstance(model, BaseEmbedder) or hasattr(model, "encode") or not callable(model):
+        return model
+    return FunctionEmbedder(model)
+
+
+def embedder_name(model: Union[str, BaseEmbedder, Callable]) -> str:
+    """Get the name of a model, used in the keys of the keyword and embedding caches. Model objects without a `name`
+    attribute are named after their class."""
+    embedder = get_embedder(model)
+    if isinstance(embedder, str):
+        return embedder
+    return getattr(embedder, "name", type(embedder).__name__)
@@ -0,0 +1,79 @@
+from typing import Callable, List
+from collections import OrderedDict
+import threading
+import numpy as np
+
+
+class EmbeddingCache(object):
+    """In-memory LRU cache of the embeddings of the documents and candidate keywords of KeyBERT.
+
+    The embeddings are keyed by the name of the embedding model and the text, so a cache can be shared by several
+    augmenters. Only the texts that are not stored are embedded by the model. When more than `max_entries` embeddings
+    are stored, the least recently used ones are evicted. The cache can be shared by several threads.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        """
+        Args:
+            max_entries (int, optional): Maximum number of embeddings stored. Defaults to 100000.
+        """
+        if max_entries < 1:
+            raise RuntimeError(f"The maximum number of embeddings must be greater than 0, got {max_entries}")
+        self.max_entries = max_entries
+        self.embeddings = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can not be pickled, worker processes create their own lock
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get_embeddings(self, model_name: str, texts: List[str], embed: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Get the embeddings of a list of texts, embedding with the model only the texts that are not stored.
+
+        Args:
+            model_name (str): Name of the embedding model.
+            texts (List[str]): Texts.
+            embed (Callable[[List[str]], np.ndarray]): Function that embeds a list of texts with the model.
+
+        Returns:
+            np.ndarray: Embeddings of the texts, one row per text.
+        """
+        keys = [(model_name, text) for text in texts]
+        with self.lock:
+            found = {}
+            for key in keys:
+                if key in self.embeddings:
+                    found[key] = self.embeddings[key]
+                    self.embeddings.move_to_end(key)
+            missing = list(OrderedDict.fromkeys(key for key in keys if key not in found))
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        # The model is called without the lock, so other threads can use the cache meanwhile
+        if missing:
+            found.update(zip(missing, embed([text for _, text in missing])))
+            with self.lock:
+                for key in missing:
+                    self.embeddings[key] = found[key]
+                while len(self.embeddings) > self.max_entries:
+                    self.embeddings.popitem(last=False)
+        return np.vstack([found[key] for key in keys]) if keys else np.empty((0, 0))
+
+    def stats(self):
+        """Get the hits, misses and number of embeddings of the cache.
+
+        Returns:
+            Dict[str, int]: Cache statistics.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.embeddings)}
+
+    def clear(self):
+        self.embeddings.clear()
@@ -2,6 +2,7 @@ from typing import List, Union, Tuple
 import spacy
 from spacy.training import offsets_to_biluo_tags, iob_utils
 from tqdm.auto import tqdm
+from .resources import word_tokenize
 
 
 ################## BILOU/IOB FORMAT ##########################
@@ -22,22 +23,32 @@ def get_all_tokens_nltk(text):
     return tokens
 
 
-def to_bilou_and_iob_format(data: List[List[Union[str, dict]]], lang: str = "en"):
+def get_blank_nlp(lang: str = "en"):
     # Create empy nlp model. It wont do anything excepting transform text into nlp doc object
     nlp = spacy.blank(lang)
     nlp.add_pipe('sentencizer')  # tokenizer
+    return nlp
+
+
+def get_bilou_and_iob_tags(nlp, text: str, entities: List[Tuple[int, int, str]]):
+    """Get the tokens of a text and their BILOU and IOB tags. The nlp model can be reused between texts."""
+    doc = nlp(text)
+    BILUO_tags = offsets_to_biluo_tags(doc, entities)
+    IOB_tags = iob_utils.biluo_to_iob(BILUO_tags)
+    tokens = get_all_tokens(doc)
+    assert len(tokens) == len(BILUO_tags)
+    assert len(tokens) == len(IOB_tags)
+    return tokens, BILUO_tags, IOB_tags
+
+
+def to_bilou_and_iob_format(data: List[List[Union[str, dict]]], lang: str = "en"):
+    nlp = get_blank_nlp(lang)
     sentence_id = []
     words = []
     BILUO_labels = []
     IOB_labels = []
     for i, (text, annotations) in enumerate(tqdm(data, desc="BILOU/IOB formatting")):
-        doc = nlp(text)
-        entities = annotations["entities"]
-        BILUO_tags = offsets_to_biluo_tags(doc, entities)
-        IOB_tags = iob_utils.biluo_to_iob(BILUO_tags)
-        tokens = get_all_tokens(doc)
-        assert len(tokens) == len(BILUO_tags)
-        assert len(tokens) == len(IOB_tags)
+        tokens, BILUO_tags, IOB_tags = get_bilou_and_iob_tags(nlp, text, annotations["entities"])
 
         sentence_id.extend([i]*len(tokens))
         words.extend(tokens)
@@ -0,0 +1,177 @@
+from typing import Dict, List, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from .resources import hash_stop_words
+
+
+class KeywordCache(object):
+    """On-disk cache of the ranked keywords extracted from each sentence.
+
+    The keywords are stored in a SQLite database keyed by a hash of the sentence and the configuration
+    of the extractor (extractor type, model name, n-gram range, stopwords, ...), so later augmentation
+    runs over the same corpus skip the keyword extraction model. When the number of entries exceeds
+    `max_entries`, the least recently used entries are evicted. The cache can be shared by several threads.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000000):
+        """
+        Args:
+            path (str): Path of the SQLite database. It is created if it does not exist.
+            max_entries (int, optional): Maximum number of sentences stored in the cache. Defaults to 1000000.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connect()
+
+    def connect(self):
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS keywords (key TEXT PRIMARY KEY, kws TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS keywords_last_used ON keywords (last_used)"
+        )
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+
+    def __getstate__(self):
+        # The SQLite connection and the lock can not be pickled, worker processes open their own connection
+        state = self.__dict__.copy()
+        del state["conn"]
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.connect()
+
+    # Kept as a method of the cache for the callers that build their own keys
+    hash_stop_words = staticmethod(hash_stop_words)
+
+    @staticmethod
+    def make_key(
+        sentence: str,
+        extractor_type: str,
+        model_name: str,
+        keyphrase_ngram_range: Tuple[int],
+        stop_words_hash: str,
+        **config,
+    ):
+        """Get the cache key of a sentence for a given extractor configuration.
+
+        Args:
+            sentence (str): Sentence from which the keywords are extracted.
+            extractor_type (str): Type of keyword extractor ("keybert", "yake", ...).
+            model_name (str): Name of the model used by the extractor.
+            keyphrase_ngram_range (Tuple[int]): Length, in words, of the extracted keywords.
+            stop_words_hash (str): Hash of the stopwords (see `hash_stop_words`).
+            config: Any other parameter that changes the keywords extracted.
+
+        Returns:
+            str: Hexadecimal key of the sentence.
+        """
+        sentence_hash = hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+        key = [
+            sentence_hash,
+            extractor_type,
+            model_name,
+            list(keyphrase_ngram_range),
+            stop_words_hash,
+            repr(sorted(config.items())),
+        ]
+        return hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]):
+        """Get the keywords stored for several keys.
+
+        Args:
+            keys (List[str]): Keys to look up.
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: Ranked keywords of each key found in the cache.
+        """
+        with self.lock:
+            found = {}
+            unique_keys = list(set(keys))
+            # SQLite limits the number of variables of a query
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i : i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, kws FROM keywords WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, kws in rows:
+                    found[key] = [tuple(kw) for kw in json.loads(kws)]
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE keywords SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self.conn.commit()
+
+            n_hits = sum(key in found for key in keys)
+            self.hits += n_hits
+            self.misses += len(keys) - n_hits
+        return found
+
+    def set_many(self, items: Dict[str, List[Tuple[str, float]]]):
+        """Store the ranked keywords of several keys and evict the least recently used entries if needed.
+
+        Args:
+            items (Dict[str, List[Tuple[str, float]]]): Ranked keywords of each key.
+        """
+        with self.lock:
+            now = time.time()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO keywords (key, kws, last_used) VALUES (?, ?, ?)",
+                [
+                    (key, json.dumps([(kw, float(score)) for kw, score in kws]), now)
+                    for key, kws in items.items()
+                ],
+            )
+            # Upper bound of the size, replaced keys are counted again until the next eviction
+            self.size += len(items)
+            if self.size > self.max_entries:
+                self.evict_entries()
+            self.conn.commit()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache has `max_entries` entries."""
+        with self.lock:
+            self.evict_entries()
+            self.conn.commit()
+
+    def evict_entries(self):
+        # Called with the lock held
+        self.size = self.conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+        n_evict = self.size - self.max_entries
+        if n_evict > 0:
+            self.conn.execute(
+                "DELETE FROM keywords WHERE key IN (SELECT key FROM keywords ORDER BY last_used ASC LIMIT ?)",
+                (n_evict,),
+            )
+            self.size -= n_evict
+
+    def stats(self):
+        """Get the hits, misses and number of entries of the cache.
+
+        Returns:
+            Dict[str, int]: Cache statistics.
+        """
+        with self.lock:
+            self.size = self.conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "size": self.size}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
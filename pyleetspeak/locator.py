@@ -0,0 +1,248 @@
+from typing import List, Tuple
+from collections import deque
+from functools import lru_cache
+import re
+
+# Number of keywords from which the keywords are searched with an Aho-Corasick automaton instead of a regex alternation
+AC_THRESHOLD = 64
+
+# Characters with a special meaning in a regular expression
+REGEX_SPECIAL_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def is_word_char(char: str):
+    # Same definition of word character as `\w` in `re` for str patterns
+    return char.isalnum() or char == "_"
+
+
+def is_word_boundary(text: str, idx: int):
+    # Same definition of word boundary as `\b` in `re`
+    before = idx > 0 and is_word_char(text[idx - 1])
+    after = idx < len(text) and is_word_char(text[idx])
+    return before != after
+
+
+class AhoCorasick(object):
+    """Aho-Corasick automaton that finds all the occurrences of a list of strings in a text in a single pass."""
+
+    def __init__(self, keywords: List[str]):
+        """
+        Args:
+            keywords (List[str]): Strings to search.
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for kw_idx, kw in enumerate(keywords):
+            node = 0
+            for char in kw:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.out[node].append(kw_idx)
+
+        # Breadth-first computation of the failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def iter(self, text: str):
+        """Find all the (possibly overlapping) occurrences of the strings in a text.
+
+        Yields:
+            Tuple[int, int]: End index of the occurrence and index of the string found.
+        """
+        node = 0
+        for idx, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for kw_idx in self.out[node]:
+                yield idx + 1, kw_idx
+
+
+class KeywordLocator(object):
+    """Locate the occurrences of a set of literal keywords in a sentence, ignoring the case.
+
+    The keywords are escaped and searched with a single compiled regex alternation, or with an Aho-Corasick
+    automaton over the case folded sentence when there are `AC_THRESHOLD` keywords or more.
+    """
+
+    def __init__(self, keywords: List[str], ac_threshold: int = AC_THRESHOLD):
+        """
+        Args:
+            keywords (List[str]): Keywords to search. Empty keywords are ignored.
+            ac_threshold (int, optional): Minimum number of keywords to use the Aho-Corasick automaton. Defaults to AC_THRESHOLD.
+        """
+        self.keywords = [kw for kw in keywords if kw]
+        self.escaped = [re.escape(kw) for kw in self.keywords]
+        self.use_ac = len(self.keywords) >= ac_threshold
+        if self.use_ac:
+            # Case folding must keep the length of the keywords to map the matches back to the sentence.
+            # The rare keywords that change their length are searched with the regex alternation
+            folded = [kw.casefold() for kw in self.keywords]
+            self.ac_idxs = [i for i, kw in enumerate(self.keywords) if len(folded[i]) == len(kw)]
+            self.regex_idxs = [i for i, kw in enumerate(self.keywords) if len(folded[i]) != len(kw)]
+            self.automaton = AhoCorasick([folded[i] for i in self.ac_idxs])
+        self.kw_patterns = {}
+        # With the automaton, the alternations are only needed for the sentences that change their length when case folded
+        self.alternation = self.findall_pattern = None
+        if not self.use_ac:
+            self.compile_alternations()
+
+    def kw_pattern(self, kw_idx: int):
+        # Pattern of a keyword followed by a word boundary, compiled the first time it is needed
+        if kw_idx not in self.kw_patterns:
+            self.kw_patterns[kw_idx] = re.compile(rf"{self.escaped[kw_idx]}\b", re.IGNORECASE)
+        return self.kw_patterns[kw_idx]
+
+    def compile_alternations(self):
+        # Starts of the keywords followed by a word boundary (lookahead, so overlapping occurrences are found)
+        self.alternation = re.compile(rf"(?=(?:{'|'.join(self.escaped)})\b)", re.IGNORECASE)
+        self.findall_pattern = re.compile("|".join(self.escaped), re.IGNORECASE)
+
+    def ac_matches(self, sentence: str, kw_idxs: List[int]):
+        """Get the (start, end, keyword index) of the occurrences found by the automaton, or None if the
+        sentence can not be searched with it."""
+        folded = sentence.casefold()
+        if len(folded) != len(sentence):
+            return None
+        matches = []
+        for end, ac_idx in self.automaton.iter(folded):
+            kw_idx = kw_idxs[ac_idx]
+            matches.append((end - len(self.keywords[kw_idx]), end, kw_idx))
+        return matches
+
+    def regex_locate(self, sentence: str, kw_idxs: List[int]):
+        if not kw_idxs:
+            return []
+        if len(kw_idxs) == len(self.keywords):
+            if self.alternation is None:
+                self.compile_alternations()
+            starts = [m.start() for m in self.alternation.finditer(sentence)]
+        else:
+            starts = range(len(sentence))
+        matches = []
+        for start in starts:
+            for kw_idx in kw_idxs:
+                m = self.kw_pattern(kw_idx).match(sentence, start)
+                if m:
+                    matches.append((start, m.end(), kw_idx))
+        return matches
+
+    def locate(self, sentence: str) -> List[Tuple[str, int, int]]:
+        """Find all the occurrences, possibly overlapping, of the keywords followed by a word boundary. It returns the
+        same occurrences as `re.finditer(rf"(?=({re.escape(kw)}\\b))", sentence, re.IGNORECASE)` for each keyword.
+
+        Args:
+            sentence (str): Sentence where the keywords are searched.
+
+        Returns:
+            List[Tuple[str, int, int]]: Keyword, start and end index of each occurrence, sorted by position and,
+                for the same position, by the order of the keywords.
+        """
+        matches = None
+        if self.use_ac:
+            matches = self.ac_matches(sentence, self.ac_idxs)
+        if matches is None:
+            matches = self.regex_locate(sentence, list(range(len(self.keywords))))
+        else:
+            matches = [m for m in matches if is_word_boundary(sentence, m[1])]
+            matches.extend(self.regex_locate(sentence, self.regex_idxs))
+        matches.sort(key=lambda m: (m[0], m[1], m[2]))
+        return [(self.keywords[kw_idx], start, end) for start, end, kw_idx in matches]
+
+    def findall(self, sentence: str) -> List[str]:
+        """Find the leftmost non-overlapping occurrences of the keywords, preferring the first keyword when several
+        start at the same position. It returns the same as `re.findall("|".join(escaped_keywords), sentence, re.IGNORECASE)`.
+
+        Args:
+            sentence (str): Sentence where the keywords are searched.
+
+        Returns:
+            List[str]: Text of the sentence matched by each occurrence.
+        """
+        if not self.keywords:
+            return []
+        matches = None
+        if self.use_ac and not self.regex_idxs:
+            matches = self.ac_matches(sentence, self.ac_idxs)
+        if matches is None:
+            if self.findall_pattern is None:
+                self.compile_alternations()
+            return self.findall_pattern.findall(sentence)
+
+        matches.sort(key=lambda m: (m[0], m[2]))
+        found = []
+        last_end = 0
+        for start, end, kw_idx in matches:
+            if start >= last_end:
+                found.append(sentence[start:end])
+                last_end = end
+        return found
+
+
+@lru_cache(maxsize=1024)
+def get_locator(keywords: Tuple[str]):
+    """Get the `KeywordLocator` of a tuple of keywords, built once and reused while it stays in the cache."""
+    return KeywordLocator(list(keywords))
+
+
+class RegexMatcher(object):
+    """Alternation of regular expressions compiled once."""
+
+    def __init__(self, patterns: List[str]):
+        self.pattern = re.compile("|".join(patterns), re.IGNORECASE)
+
+    def findall(self, sentence: str) -> List[str]:
+        return self.pattern.findall(sentence)
+
+
+@lru_cache(maxsize=128)
+def get_important_kws_matcher(important_kws: Tuple[str]):
+    """Get the matcher of the important keywords of the keyword extraction.
+
+    Important keywords may be regular expressions (e.g. r"\\bpfizer\\b"). If none of them uses a special regex
+    character, they are searched as literals with a `KeywordLocator`, which scales to large lists.
+    """
+    if any(char in REGEX_SPECIAL_CHARS for kw in important_kws for char in kw):
+        return RegexMatcher(list(important_kws))
+    return KeywordLocator(list(important_kws))
+
+
+def select_non_overlapping(spans: List[Tuple[int, int]]) -> List[int]:
+    """Select the longest spans among the overlapping ones with a sweep line over the spans sorted by position.
+
+    Two spans (x1, x2) and (y1, y2) overlap if x1 <= y2 and y1 <= x2, so adjacent spans also overlap. Sweeping the spans
+    by start, a span that overlaps the last selected span replaces it if it is at least as long (for equal lengths, the
+    later span is kept), and is discarded otherwise. A discarded span does not block the next ones. Identical spans
+    (e.g. duplicated keywords) are kept only once.
+
+    Args:
+        spans (List[Tuple[int, int]]): Start and end index of each span.
+
+    Returns:
+        List[int]: Indexes of the selected spans, in increasing order.
+    """
+    selected = []
+    for idx in sorted(range(len(spans)), key=lambda i: (spans[i][0], spans[i][1], i)):
+        start, end = spans[idx]
+        if selected:
+            last_start, last_end = spans[selected[-1]]
+            if start <= last_end:
+                # Selected spans do not overlap, so only the last one can overlap the current span
+                if end - start >= last_end - last_start:
+                    selected[-1] = idx
+                continue
+        selected.append(idx)
+    return sorted(selected)
@@ -0,0 +1,184 @@
+from typing import Iterable, Iterator
+import queue
+import threading
+
+# End of the stream of a stage
+DONE = object()
+
+
+class StageError(object):
+    """Exception raised in a stage, forwarded to the consumer of the pipeline."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline(object):
+    """Augmentation in three pipelined stages connected by bounded queues.
+
+    - Keyword extraction of the batches, in `extract_workers` threads. KeyBERT releases the GIL in torch, so several
+      batches can be extracted at once.
+    - Location and camouflage of the keywords, in a single thread (it is pure Python and GIL-bound).
+    - The consumer of the pipeline (e.g. writing the outputs), in the calling thread.
+
+    While the camouflage of batch N runs, batch N+1 is extracted and batch N-1 is consumed. Each queue holds at most
+    `queue_size` batches, so a slow stage blocks the previous ones and the memory stays bounded.
+    """
+
+    def __init__(self, augmenter, batch_size: int = 32, queue_size: int = 4, extract_workers: int = 1):
+        """
+        Args:
+            augmenter (augmenter): Augmenter that extracts and camouflages the keywords.
+            batch_size (int, optional): Number of sentences of each batch. Defaults to 32.
+            queue_size (int, optional): Maximum number of batches waiting between two stages. Defaults to 4.
+            extract_workers (int, optional): Number of keyword extraction threads. More than 1 requires an augmenter
+                with `rng_type="philox"`, whose keywords are drawn from per-sentence random streams. Defaults to 1.
+        """
+        if extract_workers > 1 and augmenter.rng_type != "philox":
+            raise RuntimeError(
+                f'extract_workers={extract_workers} requires rng_type="philox": with rng_type="{augmenter.rng_type}" the '
+                "extraction threads share the random state and the keywords depend on the order of the threads."
+            )
+        self.augmenter = augmenter
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.extract_workers = extract_workers
+
+    def run(
+        self,
+        sentences: Iterable[str],
+        stop_words,
+        keyphrase_ngram_range,
+        important_kws,
+        **kwargs,
+    ) -> Iterator:
+        """Camouflage a stream of sentences.
+
+        Args:
+            sentences (Iterable[str]): Stream of sentences. It is consumed lazily by a feeder thread.
+            stop_words, keyphrase_ngram_range, important_kws, kwargs: Arguments of the keyword extraction.
+
+        Yields:
+            The output of `transform` for each sentence, in the input order.
+        """
+        batch_queue = queue.Queue(self.queue_size)
+        kws_queue = queue.Queue(self.queue_size)
+        out_queue = queue.Queue(self.queue_size)
+        stop = threading.Event()
+
+        def put(q, item):
+            # Block while the next stage is busy, unless the pipeline is stopped
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return DONE
+
+        def feed():
+            try:
+                batch = []
+                for sentence in sentences:
+                    batch.append(sentence)
+                    if len(batch) == self.batch_size:
+                        if not put(batch_queue, self.next_batch(batch)):
+                            return
+                        batch = []
+                if batch:
+                    put(batch_queue, self.next_batch(batch))
+            except BaseException as e:
+                put(batch_queue, StageError(e))
+            finally:
+                for _ in range(self.extract_workers):
+                    put(batch_queue, DONE)
+
+        def extract():
+            try:
+                while True:
+                    item = get(batch_queue)
+                    if item is DONE or isinstance(item, StageError):
+                        if isinstance(item, StageError):
+                            put(kws_queue, item)
+                        return
+                    batch_idx, batch, sentence_ids = item
+                    all_kws = self.augmenter.get_keywords_batch(
+                        batch,
+                        stop_words,
+                        keyphrase_ngram_range,
+                        important_kws,
+                        sentence_ids=sentence_ids,
+                        **kwargs,
+                    )
+                    if not put(kws_queue, (batch_idx, batch, sentence_ids, all_kws)):
+                        return
+            except BaseException as e:
+                put(kws_queue, StageError(e))
+            finally:
+                put(kws_queue, DONE)
+
+        def camouflage():
+            try:
+                # Batches extracted out of order wait until the previous ones are camouflaged
+                pending = {}
+                next_batch = 0
+                n_done = 0
+                while n_done < self.extract_workers:
+                    item = get(kws_queue)
+                    if item is DONE:
+                        n_done += 1
+                        continue
+                    if isinstance(item, StageError):
+                        put(out_queue, item)
+                        return
+                    pending[item[0]] = item
+                    while next_batch in pending:
+                        _, batch, sentence_ids, all_kws = pending.pop(next_batch)
+                        outputs = [
+                            self.augmenter.camouflage_keywords(sentence, kws, sentence_id)
+                            for sentence, kws, sentence_id in zip(batch, all_kws, sentence_ids)
+                        ]
+                        if not put(out_queue, outputs):
+                            return
+                        next_batch += 1
+            except BaseException as e:
+                put(out_queue, StageError(e))
+            finally:
+                put(out_queue, DONE)
+
+        self.n_batches = 0
+        # The feeder is not joined: it may be blocked in a slow input iterator, and it exits at its next put
+        threading.Thread(target=feed, daemon=True).start()
+        threads = [threading.Thread(target=extract, daemon=True) for _ in range(self.extract_workers)]
+        threads += [threading.Thread(target=camouflage, daemon=True)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                outputs = out_queue.get()
+                if outputs is DONE:
+                    break
+                if isinstance(outputs, StageError):
+                    raise outputs.error
+                yield from outputs
+        finally:
+            # Stop the stages if the consumer stops early or fails
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def next_batch(self, batch):
+        # Consecutive sentence ids, as in `transform_batch`
+        first_id = self.augmenter.sentence_counter
+        self.augmenter.sentence_counter += len(batch)
+        batch_idx = self.n_batches
+        self.n_batches += 1
+        return batch_idx, batch, list(range(first_id, first_id + len(batch)))
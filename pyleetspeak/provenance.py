@@ -0,0 +1,107 @@
+from typing import Tuple
+import random
+from .LeetSpeaker import LeetSpeaker
+from .PunctuationCamouflage import PunctuationCamouflage
+from .InversionCamouflage import InversionCamouflage
+
+# Names of the scalar parameters stored in the provenance record of each kind of technique
+param_names = {
+    "leetspeak": ("change_prb", "change_frq", "uniform_change"),
+    "punct_camo": ("word_splitting", "uniform_change", "hyphenate", "lang", "n_inj"),
+    "inv_camo": ("lang", "max_dist", "only_max_dist_inv"),
+}
+
+
+class Provenance(object):
+    """Compact record of a camouflage technique applied to a keyword.
+
+    It stores the technique, the leetspeak mode, the scalar parameters and the key of the random generator used,
+    instead of the attributes of the transformer (e.g. the whole table of leetspeak substitutions). With the random
+    generator key, `replay` regenerates the exact camouflaged keyword.
+
+    The record can be indexed by the name of its attributes and parameters (e.g. `record["text_out"]`, `record["n_inj"]`).
+    """
+
+    __slots__ = ("technique", "mode", "params", "text_in", "text_out", "rng_type", "rng_key")
+
+    def __init__(
+        self,
+        technique: str,
+        params: Tuple,
+        text_in: str,
+        text_out: str,
+        mode: str = None,
+        rng_type: str = None,
+        rng_key: int = None,
+    ):
+        """
+        Args:
+            technique (str): Technique applied (e.g. "basic_leetspeak", "punct_camo", "inv_camo").
+            params (Tuple): Scalar parameters of the technique, sorted as in `param_names`.
+            text_in (str): Keyword before the technique.
+            text_out (str): Keyword after the technique.
+            mode (str, optional): Mode of leetspeak. Defaults to None.
+            rng_type (str, optional): "philox" if the technique used `random.Random(rng_key)`, "seed" if it used the
+                global random state seeded with `rng_key`, None if the random state is unknown. Defaults to None.
+            rng_key (int, optional): Key or seed of the random generator. Defaults to None.
+        """
+        self.technique = technique
+        self.mode = mode
+        self.params = params
+        self.text_in = text_in
+        self.text_out = text_out
+        self.rng_type = rng_type
+        self.rng_key = rng_key
+
+    @property
+    def kind(self):
+        return "leetspeak" if "leetspeak" in self.technique else self.technique
+
+    def to_dict(self):
+        record = {name: getattr(self, name) for name in self.__slots__ if name != "params"}
+        record.update(zip(param_names[self.kind], self.params))
+        return record
+
+    def __getitem__(self, name):
+        return self.to_dict()[name]
+
+    def __eq__(self, other):
+        return isinstance(other, Provenance) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"Provenance({fields})"
+
+
+def replay(record: Provenance):
+    """Regenerate the camouflaged keyword of a provenance record.
+
+    Args:
+        record (Provenance): Provenance record of a technique.
+
+    Returns:
+        str: The camouflaged keyword, equal to `record.text_out`.
+    """
+    if record.rng_type not in ["philox", "seed"]:
+        raise RuntimeError(
+            f"The random state of the {record.technique} record is unknown and it can not be replayed. Records can be replayed "
+            "if the augmenter has a seed and uses the default sampling, or uses rng_type='philox'."
+        )
+    # The global random state is seeded by the transformer constructor, as in the augmentation
+    py_rng = random.Random(record.rng_key) if record.rng_type == "philox" else None
+    seed = record.rng_key if record.rng_type == "seed" else None
+    params = dict(zip(param_names[record.kind], record.params))
+
+    if record.kind == "leetspeak":
+        leeter = LeetSpeaker(mode=record.mode, seed=seed, rng=py_rng, **params)
+        return leeter.text2leet(record.text_in)
+    if record.kind == "punct_camo":
+        n_inj = params.pop("n_inj")
+        punct_camo = PunctuationCamouflage(seed=seed, rng=py_rng, silent_clamp=True, **params)
+        return punct_camo.text2punctcamo(record.text_in, n_inj=n_inj)
+    if record.kind == "inv_camo":
+        inverter = InversionCamouflage(seed=seed, rng=py_rng, silent_clamp=True)
+        return inverter.text2inversion(record.text_in, **params)
+    raise RuntimeError(f"Unknown technique: {record.technique}")
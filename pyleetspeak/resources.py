@@ -0,0 +1,156 @@
+import functools
+import hashlib
+import os
+import sys
+
+# NLTK resources required by the keyword extraction. `punkt_tab` replaces `punkt` in recent NLTK versions.
+NLTK_RESOURCES = ["stopwords", "punkt", "punkt_tab"]
+
+# Local directory where the NLTK resources are searched before the default NLTK locations
+RESOURCE_DIR_ENV = "PYLEETSPEAK_NLTK_DATA"
+resource_dir = os.environ.get(RESOURCE_DIR_ENV)
+
+
+def set_resource_dir(path: str):
+    """Select the local directory where the NLTK resources are searched.
+
+    Args:
+        path (str): Directory with the NLTK data (e.g. the `download_dir` used in `prepare_resources`).
+    """
+    global resource_dir
+    # Forget the previous directory if NLTK is already loaded
+    if "nltk" in sys.modules and resource_dir in sys.modules["nltk"].data.path:
+        sys.modules["nltk"].data.path.remove(resource_dir)
+    resource_dir = path
+
+
+def load_nltk():
+    """Import NLTK and add the selected resource directory to its search path."""
+    import nltk
+
+    if resource_dir and resource_dir not in nltk.data.path:
+        nltk.data.path.insert(0, resource_dir)
+    return nltk
+
+
+def missing_resource_error(name: str):
+    nltk = load_nltk()
+    return RuntimeError(
+        f"""NLTK resource '{name}' not found. Searched in: {nltk.data.path}
+        Run `pyleetspeak.prepare_resources()` once in an environment with network access, or copy the NLTK data to a local
+        directory and select it with `pyleetspeak.set_resource_dir(path)` or the {RESOURCE_DIR_ENV} environment variable.
+        """
+    )
+
+
+def prepare_resources(download_dir: str = None, quiet: bool = False):
+    """Download the NLTK resources used by the package. This is the only function of the package that uses the network.
+
+    Args:
+        download_dir (str, optional): Directory where the resources are downloaded. It is also selected as resource
+            directory. Defaults to None, the default NLTK data directory.
+        quiet (bool, optional): Do not print the progress of the downloads. Defaults to False.
+
+    Returns:
+        bool: True if all the resources are available.
+    """
+    if download_dir:
+        set_resource_dir(download_dir)
+    nltk = load_nltk()
+    downloaded = [
+        nltk.download(name, download_dir=download_dir, quiet=quiet)
+        for name in NLTK_RESOURCES
+    ]
+    # Old NLTK versions do not know `punkt_tab`, and new versions do not need `punkt`
+    return downloaded[0] and any(downloaded[1:])
+
+
+def hash_stop_words(stop_words):
+    """Get a hash of a list of stopwords independent of its order and duplicates."""
+    if not stop_words:
+        return ""
+    return hashlib.sha1("\n".join(sorted(set(stop_words))).encode("utf-8")).hexdigest()
+
+
+class StopWords(object):
+    """Immutable collection of stopwords that is hashed only once.
+
+    Custom stopwords can be wrapped in a `StopWords` object and passed to the keyword extraction of
+    several sentences to avoid rebuilding and rehashing the collection for each sentence.
+    """
+
+    __slots__ = ("words", "word_list", "hash")
+
+    def __init__(self, words):
+        """
+        Args:
+            words (Iterable[str]): Stopwords.
+        """
+        self.words = frozenset(words)
+        # Scikit-learn vectorizers (used by KeyBERT) only accept lists of stopwords
+        self.word_list = sorted(self.words)
+        self.hash = hash_stop_words(self.word_list)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.word_list)
+
+    def __len__(self):
+        return len(self.words)
+
+
+# Stopwords of each language, loaded once per process and shared by all the instances
+stopwords_cache = {}
+
+
+def get_stopwords(lang_name: str):
+    """Get the NLTK stopwords of a language. The NLTK corpus is only read the first time.
+
+    Args:
+        lang_name (str): NLTK name of the language (e.g. "english").
+
+    Returns:
+        StopWords: Stopwords of the language.
+    """
+    if lang_name not in stopwords_cache:
+        nltk = load_nltk()
+        try:
+            words = nltk.corpus.stopwords.words(lang_name)
+        except LookupError as e:
+            raise missing_resource_error("stopwords") from e
+        stopwords_cache[lang_name] = StopWords(words)
+    return stopwords_cache[lang_name]
+
+
+def word_tokenize(text: str):
+    """Tokenize a text with the NLTK word tokenizer."""
+    nltk = load_nltk()
+    try:
+        return nltk.tokenize.word_tokenize(text)
+    except LookupError as e:
+        raise missing_resource_error("punkt") from e
+
+
+# Characters where Punkt may end a sentence. A text without them is a single sentence
+sentence_end_chars = frozenset(".?!")
+
+
+@functools.lru_cache(maxsize=65536)
+def count_words(text: str):
+    """Count the words of a text as `len(word_tokenize(text))`. The counts are cached per text, so the sentences
+    bucketed by length are not tokenized again when their keywords are extracted.
+
+    `word_tokenize` splits the sentences with Punkt and tokenizes each one with the NLTK word tokenizer. A text without
+    ".", "?" or "!" is a single sentence, so it is tokenized directly and does not need the `punkt` resource.
+
+    Args:
+        text (str): Text.
+
+    Returns:
+        int: Number of words of the text.
+    """
+    if sentence_end_chars.isdisjoint(text):
+        return len(load_nltk().tokenize.NLTKWordTokenizer().tokenize(text))
+    return len(word_tokenize(text))
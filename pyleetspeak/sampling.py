@@ -0,0 +1,73 @@
+from typing import List
+from bisect import bisect_right
+import numpy as np
+
+
+class LegacySampler(object):
+    """Random decisions of the camouflage configuration drawn one by one with `RandomState.choice`.
+
+    It reproduces the random draws of previous versions of the augmenter, so seeded results do not change.
+    """
+
+    def __init__(self, rng: np.random.RandomState):
+        self.rng = rng
+
+    def bernoulli(self, p: float) -> bool:
+        return bool(
+            self.rng.choice([True, False], size=1, replace=False, p=[p, 1 - p]).squeeze()
+        )
+
+    def choice(self, probs: List[float]) -> int:
+        return int(self.rng.choice(len(probs), size=1, replace=False, p=probs)[0])
+
+    def randint(self, low: int, high: int) -> int:
+        return int(self.rng.randint(low, high))
+
+
+class DecisionBlock(object):
+    """Random decisions of the camouflage configuration taken from blocks of uniform numbers.
+
+    The uniform numbers are generated in vectorized blocks of `block_size` and each decision (a boolean, a categorical
+    choice or an integer) consumes one of them, instead of a full `RandomState.choice` call per decision.
+    """
+
+    def __init__(self, rng: np.random.RandomState, block_size: int = 4096):
+        """
+        Args:
+            rng (np.random.RandomState): Generator of the uniform numbers.
+            block_size (int, optional): Number of uniform numbers generated at once. Defaults to 4096.
+        """
+        self.rng = rng
+        self.block_size = block_size
+        self.block = []
+        self.idx = 0
+
+    def uniform(self) -> float:
+        if self.idx == len(self.block):
+            self.block = self.rng.random_sample(self.block_size).tolist()
+            self.idx = 0
+        u = self.block[self.idx]
+        self.idx += 1
+        return u
+
+    def bernoulli(self, p: float) -> bool:
+        return self.uniform() < p
+
+    def choice(self, probs: List[float]) -> int:
+        # Cumulative probabilities are cached per list of probabilities
+        cum_probs = cumulative_probs(tuple(probs))
+        return min(bisect_right(cum_probs, self.uniform() * cum_probs[-1]), len(probs) - 1)
+
+    def randint(self, low: int, high: int) -> int:
+        if high <= low:
+            raise ValueError("high <= low")
+        return low + int(self.uniform() * (high - low))
+
+
+cumulative_probs_cache = {}
+
+
+def cumulative_probs(probs: tuple):
+    if probs not in cumulative_probs_cache:
+        cumulative_probs_cache[probs] = np.cumsum(probs).tolist()
+    return cumulative_probs_cache[probs]
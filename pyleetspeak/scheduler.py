@@ -0,0 +1,175 @@
+from typing import Callable, Iterable, Iterator, List, Tuple
+from bisect import bisect_left
+import queue
+import threading
+import time
+from .pipeline import DONE, StageError
+
+# Yielded by `LengthBucketScheduler.feed` when the oldest buffered item expires before the next item arrives
+WAKEUP = object()
+
+
+class LengthBucketScheduler(object):
+    """Group a stream of items in batches of items of similar length.
+
+    Batching items of very different length (e.g. short tweets and long posts) for a transformer wastes most of the
+    computation in padding. The items are buffered in buckets by their length, and a bucket is dispatched as a batch
+    when it is full, when its oldest item has waited `max_wait` seconds, or when `max_pending` items are buffered. The
+    batches keep the index of each item in the stream to restore the input order afterwards. With `max_wait`, the stream
+    is read by a feeder thread, so the buckets are dispatched on time even if the stream stalls (e.g. stdin or a socket).
+
+    The padding waste (fraction of padding tokens if every batch is padded to its longest item) and the batch fill
+    (mean size of the batches relative to `batch_size`) of the dispatched batches are reported by `stats`.
+    """
+
+    def __init__(
+        self,
+        bucket_bounds: Tuple[int] = (8, 16, 32, 64, 128),
+        batch_size: int = 32,
+        max_wait: float = 0.1,
+        max_pending: int = None,
+    ):
+        """
+        Args:
+            bucket_bounds (Tuple[int], optional): Upper bound of the length of the items of each bucket. Longer items
+                go to a last bucket. Defaults to (8, 16, 32, 64, 128).
+            batch_size (int, optional): Maximum number of items of a batch. Defaults to 32.
+            max_wait (float, optional): Maximum time in seconds that an item waits in its bucket. If None, the buckets
+                are only dispatched when they are full or there are too many items buffered. Defaults to 0.1.
+            max_pending (int, optional): Maximum number of items buffered in all the buckets. Defaults to None,
+                `batch_size` times the number of buckets.
+        """
+        self.bucket_bounds = sorted(bucket_bounds)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending or batch_size * (len(self.bucket_bounds) + 1)
+        self.n_batches = 0
+        self.n_items = 0
+        self.n_tokens = 0
+        self.n_padded_tokens = 0
+
+    def bucket(self, length: int) -> int:
+        return bisect_left(self.bucket_bounds, length)
+
+    def schedule(
+        self, items: Iterable, length: Callable[[object], int]
+    ) -> Iterator[List[Tuple[int, object]]]:
+        """Group the items of a stream in batches of items of similar length.
+
+        Args:
+            items (Iterable): Stream of items. It is consumed lazily.
+            length (Callable[[object], int]): Function that computes the length (e.g. number of tokens) of an item.
+
+        Yields:
+            List[Tuple[int, object]]: Batch of (index of the item in the stream, item).
+        """
+        # Items of each bucket as (index, item, length), and arrival time of the oldest item of each bucket
+        buckets = [[] for _ in range(len(self.bucket_bounds) + 1)]
+        arrivals = [None] * len(buckets)
+        n_pending = 0
+        index = 0
+        for item in self.feed(items, lambda: self.next_deadline(arrivals)):
+            if item is not WAKEUP:
+                item_length = length(item)
+                bucket_idx = self.bucket(item_length)
+                if not buckets[bucket_idx]:
+                    arrivals[bucket_idx] = time.perf_counter()
+                buckets[bucket_idx].append((index, item, item_length))
+                index += 1
+                n_pending += 1
+
+                if len(buckets[bucket_idx]) >= self.batch_size:
+                    n_pending -= len(buckets[bucket_idx])
+                    yield self.dispatch(buckets, arrivals, bucket_idx)
+            # Dispatch the bucket with the oldest item if it waited too long or too many items are buffered
+            while n_pending and (n_pending >= self.max_pending or self.oldest_expired(arrivals)):
+                oldest = min((i for i in range(len(buckets)) if buckets[i]), key=lambda i: buckets[i][0][0])
+                n_pending -= len(buckets[oldest])
+                yield self.dispatch(buckets, arrivals, oldest)
+
+        # Flush the remaining buckets, oldest items first
+        for bucket_idx in sorted((i for i in range(len(buckets)) if buckets[i]), key=lambda i: buckets[i][0][0]):
+            yield self.dispatch(buckets, arrivals, bucket_idx)
+
+    def feed(self, items: Iterable, next_deadline: Callable[[], float]) -> Iterator:
+        """Yield the items of the stream, and `WAKEUP` when the time returned by `next_deadline` passes before the next
+        item arrives. Without `max_wait`, the stream is read directly."""
+        if self.max_wait is None:
+            yield from items
+            return
+
+        item_queue = queue.Queue(self.max_pending)
+        stop = threading.Event()
+
+        def put(item):
+            # Block while the queue is full, unless the consumer stopped
+            while not stop.is_set():
+                try:
+                    item_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def read():
+            try:
+                for item in items:
+                    if not put(item):
+                        return
+                put(DONE)
+            except BaseException as e:
+                put(StageError(e))
+
+        # Daemon thread, it may stay blocked in a stalled stream after the consumer stops
+        threading.Thread(target=read, daemon=True).start()
+        try:
+            while True:
+                deadline = next_deadline()
+                try:
+                    item = item_queue.get(
+                        timeout=None if deadline is None else max(0.0, deadline - time.perf_counter())
+                    )
+                except queue.Empty:
+                    yield WAKEUP
+                    continue
+                if item is DONE:
+                    return
+                if isinstance(item, StageError):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+
+    def next_deadline(self, arrivals: List[float]) -> float:
+        # Time at which the oldest buffered item must be dispatched, None if no item is buffered
+        waiting = [arrival for arrival in arrivals if arrival is not None]
+        return min(waiting) + self.max_wait if waiting and self.max_wait is not None else None
+
+    def oldest_expired(self, arrivals: List[float]) -> bool:
+        deadline = self.next_deadline(arrivals)
+        return deadline is not None and time.perf_counter() >= deadline
+
+    def dispatch(self, buckets: List[List], arrivals: List[float], bucket_idx: int) -> List[Tuple[int, object]]:
+        batch = buckets[bucket_idx]
+        buckets[bucket_idx] = []
+        arrivals[bucket_idx] = None
+
+        lengths = [item_length for _, _, item_length in batch]
+        self.n_batches += 1
+        self.n_items += len(batch)
+        self.n_tokens += sum(lengths)
+        self.n_padded_tokens += max(lengths) * len(batch)
+        return [(index, item) for index, item, _ in batch]
+
+    def stats(self):
+        """Get the metrics of the batches dispatched.
+
+        Returns:
+            Dict[str, float]: Number of batches and items, padding waste and batch fill.
+        """
+        return {
+            "batches": self.n_batches,
+            "items": self.n_items,
+            "padding_waste": 1 - self.n_tokens / self.n_padded_tokens if self.n_padded_tokens else 0.0,
+            "batch_fill": self.n_items / (self.n_batches * self.batch_size) if self.n_batches else 0.0,
+        }
@@ -0,0 +1,264 @@
+"""Local HTTP server that keeps the camouflage models in memory.
+
+Start it with `python -m pyleetspeak.serve`. The server exposes:
+
+- POST /leet: leetspeak of the texts with a `LeetSpeaker` of the requested mode.
+- POST /augment: word camouflage of the texts with an `augmenter`.
+- POST /ner: NER data of the texts with a `NER_data_generator`.
+- GET /health: status and endpoints of the server.
+
+The body of a POST request is a JSON object with a "text" (or a list of "texts"), the arguments of the endpoint and an
+optional "timeout" in seconds. The response is a JSON object with the "result" (or the list of "results").
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import OrderedDict
+from typing import Tuple
+import argparse
+import asyncio
+import json
+import random
+import threading
+from .LeetSpeaker import LeetSpeaker
+from .aio import AsyncAugmenter
+
+# Arguments accepted by each endpoint, besides "text", "texts" and "timeout"
+leet_params = {"mode", "change_prb", "change_frq", "uniform_change"}
+augment_params = {"stop_words", "keyphrase_ngram_range", "important_kws"}
+ner_params = {"stop_words", "keyphrase_ngram_range", "important_kws"}
+
+
+class NERBatchAdapter(object):
+    """Batch interface of a `NER_data_generator`, so its requests are micro-batched by `AsyncAugmenter`. The
+    sentences of a batch are processed one by one in the worker thread."""
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def transform_batch(self, sentences, batch_size: int = None, **kwargs):
+        return [self.generator.generate_data(sentence, **kwargs) for sentence in sentences]
+
+
+class AugmentationServer(ThreadingHTTPServer):
+    """HTTP server of the camouflage models.
+
+    The models are loaded once and shared by all the requests. The requests are handled in threads, and dispatched to
+    an event loop running in a background thread, where the `AsyncAugmenter` of each endpoint coalesces the concurrent
+    requests into micro-batches.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        augmenter=None,
+        ner_generator=None,
+        seed: int = None,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        max_pending: int = 1024,
+        max_leet_speakers: int = 64,
+        quiet: bool = False,
+    ):
+        """
+        Args:
+            address (Tuple[str, int]): Host and port of the server.
+            augmenter (augmenter, optional): Augmenter of the /augment endpoint. Defaults to None, no endpoint.
+            ner_generator (NER_data_generator, optional): Generator of the /ner endpoint. Defaults to None, no endpoint.
+            seed (int, optional): Seed of the random state of the /leet endpoint. Defaults to None.
+            max_batch_size (int, optional): Maximum number of sentences of a micro-batch. Defaults to 32.
+            max_delay (float, optional): Maximum time in seconds that a request waits for other requests to fill a
+                micro-batch. Defaults to 0.005.
+            max_pending (int, optional): Maximum number of requests waiting to be batched. Defaults to 1024.
+            max_leet_speakers (int, optional): Maximum number of `LeetSpeaker` configurations kept in memory. Defaults to 64.
+            quiet (bool, optional): Do not log the requests. Defaults to False.
+        """
+        super().__init__(address, RequestHandler)
+        self.quiet = quiet
+        self.max_leet_speakers = max_leet_speakers
+        self.leet_speakers = OrderedDict()
+        self.leet_rng = random.Random(seed)
+        batch_params = dict(max_batch_size=max_batch_size, max_delay=max_delay, max_pending=max_pending)
+        self.augment = AsyncAugmenter(augmenter, **batch_params) if augmenter is not None else None
+        self.ner = AsyncAugmenter(NERBatchAdapter(ner_generator), **batch_params) if ner_generator is not None else None
+
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="pyleetspeak-loop", daemon=True)
+        self.loop_thread.start()
+
+    def endpoints(self):
+        return ["/leet"] + ["/augment"] * (self.augment is not None) + ["/ner"] * (self.ner is not None)
+
+    def run(self, coroutine):
+        # Run a coroutine in the event loop and wait for its result in the thread of the request
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get_leet_speaker(self, **params):
+        # The substitution tables of a mode are built once per configuration. All the configurations share a random state
+        key = repr(sorted(params.items()))
+        if key not in self.leet_speakers:
+            self.leet_speakers[key] = AsyncAugmenter(LeetSpeaker(rng=self.leet_rng, **params))
+            if len(self.leet_speakers) > self.max_leet_speakers:
+                self.leet_speakers.popitem(last=False)
+        self.leet_speakers.move_to_end(key)
+        return self.leet_speakers[key]
+
+    async def transform(self, endpoint: str, texts, timeout: float, params: dict):
+        # Runs in the event loop, so the `LeetSpeaker`s are used by one request at a time
+        if endpoint == "/leet":
+            transformer = self.get_leet_speaker(**params)
+            params = {}
+        else:
+            transformer = self.augment if endpoint == "/augment" else self.ner
+            if "keyphrase_ngram_range" in params:
+                params["keyphrase_ngram_range"] = tuple(params["keyphrase_ngram_range"])
+        return await transformer.transform_many_async(texts, timeout, **params)
+
+    def server_close(self):
+        for transformer in (self.augment, self.ner):
+            if transformer is not None:
+                self.run(transformer.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
+        super().server_close()
+
+
+def to_json(obj):
+    # Provenance records are sent as dicts
+    return obj.to_dict() if hasattr(obj, "to_dict") else str(obj)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = "pyleetspeak"
+
+    def send_json(self, status: int, data):
+        body = json.dumps(data, ensure_ascii=False, default=to_json).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self.send_json(404, {"error": f"Unknown endpoint {self.path}"})
+        self.send_json(200, {"status": "ok", "endpoints": self.server.endpoints()})
+
+    def do_POST(self):
+        if self.path not in self.server.endpoints():
+            return self.send_json(404, {"error": f"Unknown endpoint {self.path}"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(request, dict):
+                raise ValueError("The body must be a JSON object")
+            texts = request.pop("texts", None)
+            single = texts is None
+            if single:
+                if not isinstance(request.get("text"), str):
+                    raise ValueError('The body must have a "text" string or a "texts" list')
+                texts = [request.pop("text")]
+            elif not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError('"texts" must be a list of strings')
+            timeout = request.pop("timeout", None)
+            allowed = {"/leet": leet_params, "/augment": augment_params, "/ner": ner_params}[self.path]
+            unknown = set(request) - allowed
+            if unknown:
+                raise ValueError(f"Unknown arguments {sorted(unknown)}. The arguments of {self.path} are {sorted(allowed)}")
+        except ValueError as e:
+            return self.send_json(400, {"error": str(e)})
+
+        try:
+            results = self.server.run(self.server.transform(self.path, texts, timeout, request))
+        except asyncio.TimeoutError:
+            return self.send_json(504, {"error": f"The request did not finish in {timeout} seconds"})
+        except Exception as e:
+            return self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        self.send_json(200, {"result": results[0]} if single else {"results": results})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def build_server(args) -> AugmentationServer:
+    """Load the models of the endpoints and create the server from the command line arguments."""
+    augmenter = ner_generator = None
+    if args.extractor != "none":
+        from .WordCamouflage_Augmenter import augmenter as Augmenter
+
+        augmenter = Augmenter(
+            extractor_type=args.extractor,
+            kw_model_name=args.kw_model_name,
+            seed=args.seed,
+            lang=args.lang,
+            rng_type=args.rng_type,
+            tfidf_extractor=args.tfidf_extractor,
+        )
+    if args.ner:
+        from .Leet_NER_generator import NER_data_generator
+
+        kw_model = args.kw_model_name
+        # Share the KeyBERT model of the augmenter instead of loading a second copy
+        # (the augmenter only has a KeyBERT model with the "keybert" and "random" extractors)
+        if getattr(augmenter, "kw_model", None) is not None:
+            kw_model = augmenter.kw_model.model
+        ner_generator = NER_data_generator(kw_model_name=kw_model, seed=args.seed, lang=args.lang)
+    return AugmentationServer(
+        (args.host, args.port),
+        augmenter=augmenter,
+        ner_generator=ner_generator,
+        seed=args.seed,
+        max_batch_size=args.max_batch_size,
+        max_delay=args.max_delay,
+        max_pending=args.max_pending,
+        quiet=args.quiet,
+    )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m pyleetspeak.serve",
+        description="Local HTTP server of leetspeak, word camouflage and NER data generation.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Host of the server. Default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="Port of the server. Default: 8000")
+    parser.add_argument(
+        "--extractor",
+        default="keybert",
+        choices=["keybert", "yake", "tfidf", "random", "none"],
+        help='Keyword extractor of /augment, "none" to disable the endpoint. Default: keybert',
+    )
+    parser.add_argument(
+        "--kw-model-name",
+        default="AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2",
+        help='KeyBERT model of /augment and /ner, "hashing" for the offline backend.',
+    )
+    parser.add_argument("--tfidf-extractor", default=None, help='Fitted TF-IDF extractor for --extractor "tfidf".')
+    parser.add_argument("--ner", action="store_true", help="Enable the /ner endpoint.")
+    parser.add_argument("--lang", default="en", help="Language of the stopwords. Default: en")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random state. Default: None")
+    parser.add_argument("--rng-type", default="legacy", choices=["legacy", "philox"], help="Random state of /augment.")
+    parser.add_argument("--max-batch-size", type=int, default=32, help="Maximum sentences of a micro-batch. Default: 32")
+    parser.add_argument(
+        "--max-delay", type=float, default=0.005, help="Maximum wait in seconds to fill a micro-batch. Default: 0.005"
+    )
+    parser.add_argument("--max-pending", type=int, default=1024, help="Maximum requests waiting to be batched.")
+    parser.add_argument("--quiet", action="store_true", help="Do not log the requests.")
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    server = build_server(args)
+    print(f"Serving {', '.join(server.endpoints())} on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
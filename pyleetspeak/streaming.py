@@ -0,0 +1,268 @@
+from typing import Callable, Dict, Iterator, Tuple, Union
+import csv
+import gzip
+import io
+import json
+import os
+
+
+def is_gzip(path: str):
+    return path.endswith(".gz")
+
+
+def get_format(path: str, file_format: str = None):
+    """Get the format ("jsonl" or "csv") of a file from its extension, ignoring the ".gz" suffix."""
+    if file_format is None:
+        name = path[: -len(".gz")] if is_gzip(path) else path
+        file_format = "csv" if name.endswith(".csv") else "jsonl"
+    if file_format not in ["jsonl", "csv"]:
+        raise RuntimeError(
+            f"Unknown file format: {file_format}. Please select one of the following: ['jsonl', 'csv']"
+        )
+    return file_format
+
+
+def to_json(value):
+    # Provenance records of the camouflage techniques are stored as dicts
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def open_binary(path: str):
+    return gzip.open(path, "rb") if is_gzip(path) else open(path, "rb")
+
+
+def read_records(
+    path: str, file_format: str = None, start_offset: int = 0
+) -> Iterator[Tuple[int, Dict]]:
+    """Lazily read the records of a JSONL or CSV file (optionally gzip compressed).
+
+    Args:
+        path (str): Path of the file.
+        file_format (str, optional): "jsonl" or "csv". Defaults to None, detected from the extension.
+        start_offset (int, optional): Byte offset (of the uncompressed data) of the first record to read, as
+            returned by a previous read. Defaults to 0, the beginning of the file.
+
+    Yields:
+        Tuple[int, Dict]: Byte offset of the end of the record and the record. CSV records are dicts keyed by the header.
+    """
+    file_format = get_format(path, file_format)
+    with open_binary(path) as f:
+        if file_format == "jsonl":
+            f.seek(start_offset)
+            offset = start_offset
+            for line in f:
+                offset += len(line)
+                if line.strip():
+                    yield offset, json.loads(line)
+            return
+
+        # The csv reader pulls physical lines one by one until a record (that may contain
+        # quoted line breaks) is complete, so the bytes pulled give the offset of each record
+        offset = 0
+
+        def lines():
+            nonlocal offset
+            for line in f:
+                offset += len(line)
+                yield line.decode("utf-8")
+
+        line_iter = lines()
+        fieldnames = next(csv.reader(line_iter), None)
+        if fieldnames is None:
+            return
+        if start_offset > offset:
+            f.seek(start_offset)
+            offset = start_offset
+        for row in csv.reader(line_iter):
+            if row:
+                yield offset, dict(zip(fieldnames, row))
+
+
+class RecordWriter(object):
+    """Append records to a JSONL or CSV file in chunks. With gzip, each chunk is written as an independent
+    gzip member, so the file can be truncated at the end of any chunk and is still a valid gzip file."""
+
+    def __init__(self, path: str, file_format: str = None, offset: int = None):
+        """
+        Args:
+            path (str): Path of the output file.
+            file_format (str, optional): "jsonl" or "csv". Defaults to None, detected from the extension.
+            offset (int, optional): Size of the file at the last checkpoint. The file is truncated to this size to
+                discard the records written after the checkpoint. Defaults to None, the file is overwritten.
+        """
+        self.path = path
+        self.file_format = get_format(path, file_format)
+        self.fieldnames = None
+        if offset is None:
+            self.f = open(path, "wb")
+        else:
+            self.f = open(path, "r+b")
+            self.f.truncate(offset)
+            self.f.seek(offset)
+            if self.file_format == "csv":
+                # Recover the columns of the header already written
+                with open_binary(path) as f_in:
+                    self.fieldnames = next(csv.reader([f_in.readline().decode("utf-8")]))
+
+    def encode(self, records):
+        buffer = io.StringIO()
+        if self.file_format == "jsonl":
+            for record in records:
+                buffer.write(json.dumps(record, ensure_ascii=False, default=to_json) + "\n")
+        else:
+            if self.fieldnames is None:
+                self.fieldnames = list(records[0].keys()) if records else []
+                csv.writer(buffer).writerow(self.fieldnames)
+            writer = csv.DictWriter(buffer, self.fieldnames, extrasaction="ignore")
+            for record in records:
+                # Nested values (e.g. entities or keyword metadata) are stored as JSON
+                writer.writerow(
+                    {
+                        k: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False, default=to_json)
+                        for k, v in record.items()
+                    }
+                )
+        data = buffer.getvalue().encode("utf-8")
+        return gzip.compress(data) if is_gzip(self.path) else data
+
+    def write_chunk(self, records):
+        """Write a chunk of records and flush it to disk.
+
+        Returns:
+            int: Size of the file after the chunk.
+        """
+        self.f.write(self.encode(records))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+def load_checkpoint(checkpoint_path: str):
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            return json.load(f)
+    return None
+
+
+def save_checkpoint(checkpoint_path: str, checkpoint: dict):
+    # Write and rename, so a job killed while saving keeps the previous checkpoint
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def get_transform_function(transformer):
+    """Get a function that camouflages a chunk of sentences and returns the output fields of each one."""
+    if hasattr(transformer, "generate_data"):
+        # NER_data_generator
+        def transform_chunk(sentences, start_index, **kwargs):
+            outputs = []
+            for sentence in sentences:
+                NER_data, ori_data = transformer.generate_data(sentence, **kwargs)
+                leet_sentence, annotations = NER_data[0]
+                outputs.append(
+                    {
+                        "leet_sentence": leet_sentence,
+                        "entities": annotations["entities"],
+                        "meta": ori_data["meta"],
+                    }
+                )
+            return outputs
+
+    elif hasattr(transformer, "transform_batch"):
+        # augmenter. The sentence ids follow the record index, so with `rng_type="philox"` a resumed
+        # job gives the same output as an uninterrupted one
+        def transform_chunk(sentences, start_index, **kwargs):
+            transformer.sentence_counter = start_index
+            outputs = []
+            for result in transformer.transform_batch(sentences, **kwargs):
+                if isinstance(result, tuple):
+                    outputs.append({"leet_sentence": result[0], "meta": result[1]["meta"]})
+                else:
+                    outputs.append({"leet_sentence": result})
+            return outputs
+
+    else:
+        # Any function of a sentence, e.g. `LeetSpeaker(...).text2leet`
+        def transform_chunk(sentences, start_index, **kwargs):
+            return [{"leet_sentence": transformer(sentence, **kwargs)} for sentence in sentences]
+
+    return transform_chunk
+
+
+def augment_file(
+    transformer: Union[Callable[[str], str], object],
+    input_path: str,
+    output_path: str,
+    text_field: str = "text",
+    chunk_size: int = 1000,
+    checkpoint_path: str = None,
+    input_format: str = None,
+    output_format: str = None,
+    **kwargs,
+):
+    """Camouflage the sentences of a JSONL or CSV file and write the results to another file, chunk by chunk.
+
+    The input is read lazily and only one chunk of records is kept in memory. Files ending in ".gz" are read and
+    written with gzip. After each chunk, the byte offsets of the input and the output are saved in `checkpoint_path`,
+    so a killed job run again with the same arguments resumes from the last chunk written.
+
+    Each output record is the input record plus the "leet_sentence" field. `NER_data_generator` also adds the
+    "entities" and "meta" fields, and `augmenter` the "meta" field if `return_kws=True`.
+
+    Args:
+        transformer: An `augmenter`, a `NER_data_generator` or any function that camouflages a sentence.
+        input_path (str): Path of the input file.
+        output_path (str): Path of the output file.
+        text_field (str, optional): Field (or CSV column) with the sentence to camouflage. Defaults to "text".
+        chunk_size (int, optional): Number of records camouflaged and written at once. Defaults to 1000.
+        checkpoint_path (str, optional): Path of the checkpoint file. Defaults to None, `output_path` + ".ckpt".
+        input_format (str, optional): "jsonl" or "csv". Defaults to None, detected from the extension.
+        output_format (str, optional): "jsonl" or "csv". Defaults to None, detected from the extension.
+        kwargs: Arguments of the camouflage (stop_words, keyphrase_ngram_range, important_kws, ...).
+
+    Returns:
+        int: Total number of records written to the output file.
+    """
+    checkpoint_path = checkpoint_path or output_path + ".ckpt"
+    checkpoint = load_checkpoint(checkpoint_path) or {
+        "input_offset": 0,
+        "output_offset": None,
+        "n_records": 0,
+    }
+    transform_chunk = get_transform_function(transformer)
+    writer = RecordWriter(output_path, output_format, checkpoint["output_offset"])
+
+    def flush(chunk, input_offset):
+        outputs = transform_chunk(
+            [record[text_field] for record in chunk], checkpoint["n_records"], **kwargs
+        )
+        for record, output in zip(chunk, outputs):
+            record.update(output)
+        checkpoint["output_offset"] = writer.write_chunk(chunk)
+        checkpoint["input_offset"] = input_offset
+        checkpoint["n_records"] += len(chunk)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    try:
+        chunk = []
+        for input_offset, record in read_records(
+            input_path, input_format, checkpoint["input_offset"]
+        ):
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                flush(chunk, input_offset)
+                chunk = []
+        if chunk:
+            flush(chunk, input_offset)
+    finally:
+        writer.close()
+    return checkpoint["n_records"]
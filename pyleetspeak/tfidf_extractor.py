@@ -0,0 +1,162 @@
+from typing import List, Tuple, Union
+import json
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from .resources import StopWords
+
+# Parameters of the vectorizer that are functions, they can not be saved in a JSON file
+callable_params = ("preprocessor", "tokenizer", "analyzer")
+
+
+class TfidfExtractor(object):
+    """Keyword extractor that ranks the words of a sentence by their TF-IDF weight in a corpus.
+
+    A scikit-learn `TfidfVectorizer` is fitted once over the corpus. The sentences of a batch are vectorized as a single
+    sparse matrix, and the top keywords of all the rows are selected with a single sort of the non zero weights, so
+    extracting keywords costs a fraction of a KeyBERT forward pass. The fitted vocabulary can be saved and loaded to
+    reuse it between runs.
+    """
+
+    def __init__(self, ngram_range: Tuple[int, int] = (1, 1), **kwargs):
+        """
+        Args:
+            ngram_range (Tuple[int, int], optional): Length, in words, of the terms of the vocabulary. Defaults to (1, 1).
+            kwargs: Other parameters of the `TfidfVectorizer` (e.g. `min_df`, `max_features`, `stop_words`).
+        """
+        self.vectorizer = TfidfVectorizer(ngram_range=ngram_range, **kwargs)
+        self.terms = None
+        # Mask of the candidate terms for each (stopwords, n-gram range)
+        self.masks = {}
+
+    @property
+    def fitted(self):
+        return self.terms is not None
+
+    def fit(self, sentences: List[str]):
+        """Fit the TF-IDF weights over a corpus.
+
+        Args:
+            sentences (List[str]): Sentences of the corpus.
+
+        Returns:
+            TfidfExtractor: The fitted extractor.
+        """
+        self.vectorizer.fit(sentences)
+        self.set_terms()
+        return self
+
+    def set_terms(self):
+        self.terms = np.array(self.vectorizer.get_feature_names_out(), dtype=object)
+        self.masks = {}
+
+    def candidate_mask(self, stop_words: StopWords, keyphrase_ngram_range: Tuple[int, int]):
+        # Terms that can be keywords: with the length of the n-gram range and without stopwords
+        key = (stop_words.hash if stop_words is not None else "", tuple(keyphrase_ngram_range))
+        if key not in self.masks:
+            min_n, max_n = keyphrase_ngram_range
+            self.masks[key] = np.array(
+                [
+                    min_n <= len(words) <= max_n
+                    and (stop_words is None or not any(w in stop_words for w in words))
+                    for words in (term.split() for term in self.terms)
+                ],
+                dtype=bool,
+            )
+        return self.masks[key]
+
+    def extract_keywords(
+        self,
+        sentences: List[str],
+        top_n: Union[int, List[int]] = 5,
+        stop_words: StopWords = None,
+        keyphrase_ngram_range: Tuple[int, int] = (1, 1),
+    ) -> List[List[Tuple[str, float]]]:
+        """Extract the terms with the highest TF-IDF weight of each sentence.
+
+        Args:
+            sentences (List[str]): Sentences.
+            top_n (Union[int, List[int]], optional): Number of keywords of all the sentences, or of each sentence. Defaults to 5.
+            stop_words (StopWords, optional): Stopwords that can not be keywords. Defaults to None.
+            keyphrase_ngram_range (Tuple[int, int], optional): Length, in words, of the keywords. Defaults to (1, 1).
+
+        Returns:
+            List[List[Tuple[str, float]]]: (keyword, weight) tuples of each sentence, sorted by decreasing weight.
+        """
+        if not self.fitted:
+            raise RuntimeError(
+                "The TF-IDF extractor is not fitted. Fit it over the corpus with `fit` or load a fitted vocabulary with `TfidfExtractor.load`."
+            )
+        if isinstance(top_n, int):
+            top_n = [top_n] * len(sentences)
+
+        matrix = self.vectorizer.transform(sentences).tocsr()
+        # Discard the weights of the terms that can not be keywords
+        matrix.data[~self.candidate_mask(stop_words, keyphrase_ngram_range)[matrix.indices]] = 0
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+
+        # Sort the weights of all the rows at once: by row and by decreasing weight (ties by vocabulary order)
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        order = np.lexsort((-matrix.data, rows))
+        data = matrix.data[order]
+        terms = self.terms[matrix.indices[order]]
+
+        all_kws = []
+        for row, n_kw in enumerate(top_n):
+            start = matrix.indptr[row]
+            end = min(start + n_kw, matrix.indptr[row + 1])
+            all_kws.append(list(zip(terms[start:end].tolist(), data[start:end].tolist())))
+        return all_kws
+
+    def save(self, path: str):
+        """Save the parameters of the vectorizer and the fitted vocabulary and weights in a JSON file.
+
+        Args:
+            path (str): Path of the file.
+        """
+        if not self.fitted:
+            raise RuntimeError("The TF-IDF extractor is not fitted, there is no vocabulary to save.")
+        params = self.vectorizer.get_params()
+        custom = [name for name in callable_params if callable(params[name])]
+        if custom:
+            raise RuntimeError(f"The TF-IDF extractor can not be saved with custom functions as {custom}.")
+        # The fitted vocabulary is saved instead of the parameter
+        del params["vocabulary"]
+        params["dtype"] = np.dtype(params["dtype"]).name
+        if params["stop_words"] is not None and not isinstance(params["stop_words"], str):
+            params["stop_words"] = list(params["stop_words"])
+        state = {
+            "params": params,
+            "vocabulary": {term: int(i) for term, i in self.vectorizer.vocabulary_.items()},
+            "idf": self.vectorizer.idf_.tolist() if params["use_idf"] else None,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a fitted extractor saved with `save`.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            TfidfExtractor: The fitted extractor.
+        """
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        params = state["params"]
+        params["ngram_range"] = tuple(params["ngram_range"])
+        if "dtype" in params:
+            params["dtype"] = np.dtype(params["dtype"]).type
+        # Files saved by previous versions only have the terms, sorted by their index
+        vocabulary = state.get("vocabulary") or {term: i for i, term in enumerate(state["terms"])}
+        extractor = cls(vocabulary=vocabulary, **params)
+        # With a fixed vocabulary, fitting only builds the vocabulary and the IDF transformer. The IDF weights of the
+        # fitted vectorizer (of an empty document, hence the division by zero) are then replaced by the saved ones
+        with np.errstate(divide="ignore"):
+            extractor.vectorizer.fit([""])
+        if state["idf"] is not None:
+            extractor.vectorizer.idf_ = np.array(state["idf"])
+        extractor.set_terms()
+        return extractor
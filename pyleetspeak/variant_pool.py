@@ -0,0 +1,65 @@
+from typing import Hashable, List
+from collections import OrderedDict
+
+
+class VariantPool(object):
+    """In-memory cache of pools of camouflaged variants of the most recently used keywords.
+
+    For each key (keyword and camouflage techniques) it stores `pool_size` variants sampled with the camouflage
+    techniques, so later occurrences of the keyword pick one of the variants instead of running the techniques again.
+    When more than `max_keys` keys are stored, the least recently used key is evicted.
+    """
+
+    def __init__(self, pool_size: int = 16, max_keys: int = 10000):
+        """
+        Args:
+            pool_size (int, optional): Number of variants sampled for each key. Defaults to 16.
+            max_keys (int, optional): Maximum number of keys stored. Defaults to 10000.
+        """
+        if pool_size < 1:
+            raise RuntimeError(f"The pool size must be greater than 0, got {pool_size}")
+        self.pool_size = pool_size
+        self.max_keys = max_keys
+        self.pools = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        """Get the variants of a key.
+
+        Args:
+            key (Hashable): Key of the pool.
+
+        Returns:
+            List: Variants of the key, or None if the key is not stored.
+        """
+        variants = self.pools.get(key)
+        if variants is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.pools.move_to_end(key)
+        return variants
+
+    def add(self, key: Hashable, variants: List):
+        """Store the variants of a key and evict the least recently used key if needed.
+
+        Args:
+            key (Hashable): Key of the pool.
+            variants (List): Sampled variants of the key.
+        """
+        self.pools[key] = variants
+        self.pools.move_to_end(key)
+        if len(self.pools) > self.max_keys:
+            self.pools.popitem(last=False)
+
+    def stats(self):
+        """Get the hits, misses and number of keys of the pool.
+
+        Returns:
+            Dict[str, int]: Pool statistics.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.pools)}
+
+    def clear(self):
+        self.pools.clear()
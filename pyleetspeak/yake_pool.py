@@ -0,0 +1,62 @@
+from typing import List, Tuple
+import multiprocessing
+import os
+import weakref
+import yake
+
+# YAKE extractor of each worker process
+worker_state = {}
+
+
+def init_yake_worker(yake_params):
+    worker_state["extractor"] = yake.KeywordExtractor(**yake_params)
+
+
+def worker_extract(sentence):
+    return worker_state["extractor"].extract_keywords(sentence)
+
+
+class YakePool(object):
+    """YAKE keyword extraction sharded over a pool of processes.
+
+    YAKE is pure Python and CPU-bound, so the sentences of a batch are split in chunks and sent to a pool of processes.
+    Each worker builds its `yake.KeywordExtractor` once, and the keywords are returned in the order of the sentences.
+    """
+
+    def __init__(self, yake_params: dict, n_workers: int = None, chunksize: int = 64, start_method: str = None):
+        """
+        Args:
+            yake_params (dict): Parameters of the `yake.KeywordExtractor` of the workers.
+            n_workers (int, optional): Number of worker processes. Defaults to None, the number of CPUs.
+            chunksize (int, optional): Maximum number of sentences sent to a worker at once. Defaults to 64.
+            start_method (str, optional): Start method of the worker processes ("fork", "spawn", "forkserver").
+                Defaults to None, the platform default.
+        """
+        self.n_workers = n_workers or os.cpu_count()
+        self.chunksize = chunksize
+        ctx = multiprocessing.get_context(start_method)
+        self.pool = ctx.Pool(self.n_workers, initializer=init_yake_worker, initargs=(yake_params,))
+        # Stop the workers when the pool is garbage collected or at exit
+        self.finalizer = weakref.finalize(self, self.pool.terminate)
+
+    def extract_keywords(self, sentences: List[str]) -> List[List[Tuple[str, float]]]:
+        """Extract the keywords of a batch of sentences.
+
+        Args:
+            sentences (List[str]): Sentences.
+
+        Returns:
+            List[List[Tuple[str, float]]]: (keyword, score) tuples of each sentence, equally sorted as `sentences`.
+        """
+        # Small batches are split among all the workers
+        chunksize = max(1, min(self.chunksize, -(-len(sentences) // self.n_workers)))
+        return self.pool.map(worker_extract, sentences, chunksize)
+
+    def close(self):
+        self.finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -58,6 +58,7 @@ setup(
         "yake==0.4.8",
     ],
     setup_requires=["nltk"],
+    entry_points={"console_scripts": ["pyleetspeak=pyleetspeak.cli:main"]},
     keywords=[
         "leetspeak",
         "woord camouflage",
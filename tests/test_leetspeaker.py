@@ -4,8 +4,45 @@ from pyleetspeak import (
     PunctuationCamouflage,
     InversionCamouflage,
     WordCamouflage_Augmenter,
+    get_clamp_counts,
+    reset_clamp_counts,
+    KeywordCache,
+    StopWords,
+    set_resource_dir,
+    augment_file,
+    read_records,
+    Provenance,
+    replay,
 )
+from pyleetspeak import resources
+from pyleetspeak.locator import KeywordLocator, select_non_overlapping
+from pyleetspeak.sampling import DecisionBlock, LegacySampler
+from pyleetspeak.variant_pool import VariantPool
+from pyleetspeak.tfidf_extractor import TfidfExtractor
+from pyleetspeak.embedding_cache import EmbeddingCache
+from pyleetspeak.scheduler import LengthBucketScheduler
+from pyleetspeak.aio import AsyncAugmenter
+from pyleetspeak import serve
+from pyleetspeak import cli
+import numpy as np
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import pickle
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
 import unittest
+import warnings
 
 
 class TestText2Leet(unittest.TestCase):
@@ -87,6 +124,541 @@ class TestText2Inv(unittest.TestCase):
         self.assertEqual(res, "cuvana")
 
 
+class TestImport(unittest.TestCase):
+    # Maximum time in seconds to import the core of the package
+    IMPORT_BUDGET = 2.0
+
+    def test_core_import_is_lightweight(self):
+        heavy_modules = ["torch", "keybert", "spacy", "sklearn", "matplotlib", "nltk"]
+        code = (
+            "import sys, time; t = time.perf_counter(); import pyleetspeak; "
+            "print(time.perf_counter() - t); "
+            f"print(','.join(m for m in {heavy_modules!r} if m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        self.assertLess(float(out[0]), self.IMPORT_BUDGET)
+        self.assertEqual(out[1], "")
+
+
+class TestClamping(unittest.TestCase):
+    def test_silent_clamp_counts(self):
+        reset_clamp_counts()
+        wrd_camo = PunctuationCamouflage(
+            uniform_change=True, silent_clamp=True, seed=40  # for reproducibility
+        )
+        inverter = InversionCamouflage(silent_clamp=True, seed=21)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            for _ in range(3):
+                res = wrd_camo.text2punctcamo("vacuna", n_inj=10)
+                self.assertEqual(len(res), 12)
+            inverter.text2inversion("vacuna", lang="es", max_dist=4)
+
+        self.assertEqual(
+            get_clamp_counts(), {"punct_text_length": 3, "inv_max_dist": 1}
+        )
+        reset_clamp_counts()
+        self.assertEqual(get_clamp_counts(), {})
+
+    def test_clamp_warning(self):
+        reset_clamp_counts()
+        wrd_camo = PunctuationCamouflage(uniform_change=True, seed=40)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            wrd_camo.text2punctcamo("vacuna", n_inj=10)
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, RuntimeWarning)
+        self.assertEqual(get_clamp_counts(), {"punct_text_length": 1})
+
+
+def has_punkt():
+    try:
+        resources.word_tokenize("Is punkt available? Yes.")
+        return True
+    except RuntimeError:
+        return False
+
+
+class TestKeywordCache(unittest.TestCase):
+    def test_keyword_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "kws.sqlite")
+            stop_words_hash = KeywordCache.hash_stop_words(["the", "a"])
+            self.assertEqual(stop_words_hash, KeywordCache.hash_stop_words(["a", "the", "a"]))
+            keys = [
+                KeywordCache.make_key(s, "keybert", "model", (1, 1), stop_words_hash)
+                for s in ["vaccines kill", "covid is a lie", "stay home"]
+            ]
+            self.assertNotEqual(
+                keys[0],
+                KeywordCache.make_key("vaccines kill", "yake", "model", (1, 1), stop_words_hash),
+            )
+
+            cache = KeywordCache(path, max_entries=2)
+            self.assertEqual(cache.get_many(keys[:1]), {})
+            cache.set_many({keys[0]: [("vaccines", 0.9), ("kill", 0.5)]})
+            cache.set_many({keys[1]: [("covid", 0.8)]})
+            self.assertEqual(
+                cache.get_many(keys[:1]), {keys[0]: [("vaccines", 0.9), ("kill", 0.5)]}
+            )
+            # The least recently used entry is evicted
+            cache.set_many({keys[2]: [("home", 0.7)]})
+            self.assertEqual(set(cache.get_many(keys)), {keys[0], keys[2]})
+            self.assertEqual(cache.stats(), {"hits": 3, "misses": 2, "size": 2})
+            cache.close()
+
+            # The cache persists between runs and processes
+            cache = pickle.loads(pickle.dumps(KeywordCache(path, max_entries=2)))
+            self.assertEqual(cache.get_many(keys[2:]), {keys[2]: [("home", 0.7)]})
+            cache.close()
+
+    def test_keyword_cache_threads(self):
+        # Several threads share the connection and the counters of a cache
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = KeywordCache(os.path.join(tmp_dir, "kws.sqlite"), max_entries=50)
+            errors = []
+
+            def worker(worker_idx):
+                try:
+                    for i in range(50):
+                        key = KeywordCache.make_key(f"sentence {worker_idx} {i}", "yake", "model", (1, 1), "")
+                        cache.get_many([key])
+                        cache.set_many({key: [(str(i), 0.5)]})
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(cache.stats(), {"hits": 0, "misses": 200, "size": 50})
+            cache.close()
+
+
+class TestResources(unittest.TestCase):
+    def test_local_resource_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "corpora", "stopwords"))
+            with open(os.path.join(tmp_dir, "corpora", "stopwords", "english"), "w") as f:
+                f.write("the\nis\n")
+            set_resource_dir(tmp_dir)
+            try:
+                stop_words = resources.get_stopwords("english")
+                self.assertEqual(stop_words.words, frozenset(["the", "is"]))
+                # The corpus is read only once per language
+                self.assertIs(resources.get_stopwords("english"), stop_words)
+            finally:
+                set_resource_dir(None)
+
+
+    def test_custom_stop_words(self):
+        stop_words = StopWords(["the", "is", "the"])
+        self.assertEqual(stop_words.word_list, ["is", "the"])
+        self.assertIn("is", stop_words)
+        self.assertEqual(stop_words.hash, resources.hash_stop_words(["is", "the"]))
+
+    def test_count_words(self):
+        from nltk.tokenize import NLTKWordTokenizer
+
+        sentences = [
+            "The covid vaccine is a lie from the pharma industry",
+            "I cannot believe it's \"really\" 1,000 dollars (don't go) -- we'll see at 10:30",
+            "help='KeyBERT model, \"hashing\" for the offline backend'",
+        ]
+        # Sentences without ".", "?" or "!", so the Punkt sentence splitting is not needed
+        for sentence in sentences:
+            self.assertEqual(
+                resources.count_words(sentence),
+                len(NLTKWordTokenizer().tokenize(sentence)),
+            )
+
+    @unittest.skipUnless(has_punkt(), "the punkt resource is not available")
+    def test_count_words_threshold(self):
+        # The number of keywords depends on whether the sentence has fewer than 10 words as in `word_tokenize`
+        sentences = [
+            "The covid vaccine number 1 is a lie",
+            "The covid vaccine is a lie from the pharma industry",
+            "The end. Of the vaccine. Is near, Dr. Smith said.",
+            "I cannot believe it's \"really\" 1,000 U.S. dollars... right?!",
+            "help='KeyBERT model, \"hashing\" for the offline backend.'",
+        ]
+        for sentence in sentences:
+            self.assertEqual(resources.count_words(sentence), len(resources.word_tokenize(sentence)))
+            self.assertEqual(resources.count_words(sentence) < 10, len(resources.word_tokenize(sentence)) < 10)
+
+
+class TestStreaming(unittest.TestCase):
+    def test_augment_file_resume(self):
+        sentences = [f"vaccine {i}" for i in range(10)]
+        calls = []
+
+        def failing_upper(sentence):
+            calls.append(sentence)
+            if len(calls) == 7:
+                raise KeyboardInterrupt
+            return sentence.upper()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_path = os.path.join(tmp_dir, "in.jsonl")
+            output_path = os.path.join(tmp_dir, "out.jsonl.gz")
+            with open(input_path, "w") as f:
+                for i, sentence in enumerate(sentences):
+                    f.write(json.dumps({"id": i, "text": sentence}) + "\n")
+
+            with self.assertRaises(KeyboardInterrupt):
+                augment_file(failing_upper, input_path, output_path, chunk_size=3)
+            # The job resumes after the last chunk written (records 0-5)
+            self.assertEqual(augment_file(failing_upper, input_path, output_path, chunk_size=3), 10)
+            self.assertEqual(calls[7:], sentences[6:])
+            with gzip.open(output_path, "rt") as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual([r["id"] for r in records], list(range(10)))
+            self.assertEqual(records[9]["leet_sentence"], "VACCINE 9")
+
+    def test_read_csv_offsets(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "in.csv")
+            with open(path, "w") as f:
+                f.write('id,text\n0,"covid\nvaccine"\n1,lie\n2,pharma\n')
+            records = list(read_records(path))
+            self.assertEqual(records[0][1], {"id": "0", "text": "covid\nvaccine"})
+            # Start reading after the second record
+            self.assertEqual(
+                [r for _, r in read_records(path, start_offset=records[1][0])],
+                [{"id": "2", "text": "pharma"}],
+            )
+
+
+class TestKeywordLocator(unittest.TestCase):
+    def test_locate(self):
+        sentence = "Covid vaccines? The c++ vaccine, COVID-19 vaccine-covid"
+        kws = ["vaccine", "covid", "c++", "covid vaccines"]
+        expected = sorted(
+            [
+                (kw, m.start(1), m.end(1))
+                for kw in kws
+                for m in re.finditer(rf"(?=({re.escape(kw)}\b))", sentence, re.IGNORECASE)
+            ],
+            key=lambda m: m[1:],
+        )
+        # Regex alternation and Aho-Corasick automaton find the same occurrences
+        self.assertEqual(KeywordLocator(kws).locate(sentence), expected)
+        self.assertEqual(KeywordLocator(kws, ac_threshold=1).locate(sentence), expected)
+
+    def test_findall(self):
+        sentence = "Pfizer and pfizerbiontech vaccines"
+        kws = ["pfizer", "pfizerbiontech", "vaccine"]
+        expected = ["Pfizer", "pfizer", "vaccine"]
+        self.assertEqual(KeywordLocator(kws).findall(sentence), expected)
+        self.assertEqual(KeywordLocator(kws, ac_threshold=1).findall(sentence), expected)
+
+    def test_select_non_overlapping(self):
+        spans = [(0, 5), (0, 14), (6, 13), (15, 20), (20, 23), (20, 23), (30, 40), (40, 45)]
+        # The longest span of each overlap is kept, the later one for equal lengths
+        self.assertEqual(select_non_overlapping(spans), [1, 3, 6])
+        self.assertEqual(select_non_overlapping([(0, 3), (3, 6), (8, 9)]), [1, 2])
+        self.assertEqual(select_non_overlapping([]), [])
+
+
+class TestSampling(unittest.TestCase):
+    def test_legacy_sampler(self):
+        # Same draws as the previous RandomState.choice calls
+        rng = np.random.RandomState(21)
+        expected = [
+            rng.choice(["basic", "covid_basic", "advanced"], size=1, replace=False, p=[0.5, 0.3, 0.2]).squeeze(),
+            rng.choice([True, False], size=1, replace=False, p=[0.6, 0.4]).squeeze(),
+            rng.randint(1, 4),
+        ]
+        sampler = LegacySampler(np.random.RandomState(21))
+        self.assertEqual(
+            [["basic", "covid_basic", "advanced"][sampler.choice([0.5, 0.3, 0.2])], sampler.bernoulli(0.6), sampler.randint(1, 4)],
+            expected,
+        )
+
+    def test_decision_block(self):
+        block = DecisionBlock(np.random.RandomState(21), block_size=64)
+        choices = [block.choice([0.25, 0.5, 0.25]) for _ in range(10000)]
+        self.assertEqual(set(choices), {0, 1, 2})
+        self.assertAlmostEqual(choices.count(1) / 10000, 0.5, delta=0.03)
+        self.assertAlmostEqual(sum(block.bernoulli(0.2) for _ in range(10000)) / 10000, 0.2, delta=0.03)
+        self.assertEqual({block.randint(1, 4) for _ in range(1000)}, {1, 2, 3})
+
+
+class TestVariantPool(unittest.TestCase):
+    def test_lru_eviction(self):
+        pool = VariantPool(pool_size=2, max_keys=2)
+        pool.add(("vaccine", ("punct_camo",)), ["v.accine", "vacc-ine"])
+        pool.add(("covid", ("punct_camo",)), ["c.ovid", "cov-id"])
+        self.assertEqual(pool.get(("vaccine", ("punct_camo",))), ["v.accine", "vacc-ine"])
+        # The least recently used key is evicted
+        pool.add(("pfizer", ("punct_camo",)), ["pf.izer", "pfi-zer"])
+        self.assertIsNone(pool.get(("covid", ("punct_camo",))))
+        self.assertEqual(pool.stats(), {"hits": 1, "misses": 1, "size": 2})
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_get_embeddings(self):
+        embedded = []
+
+        def embed(texts):
+            embedded.extend(texts)
+            return np.array([[len(text), text.count("a")] for text in texts], dtype=float)
+
+        cache = EmbeddingCache(max_entries=3)
+        res = cache.get_embeddings("model", ["vaccine", "pharma", "vaccine"], embed)
+        self.assertEqual(res.tolist(), [[7, 1], [6, 2], [7, 1]])
+        # Only the texts that are not stored are embedded
+        cache.get_embeddings("model", ["pharma", "covid", "lie"], embed)
+        self.assertEqual(embedded, ["vaccine", "pharma", "covid", "lie"])
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "size": 3})
+        # The embeddings of other models are different keys
+        cache.get_embeddings("other_model", ["covid"], embed)
+        self.assertEqual(embedded[-1], "covid")
+
+
+class TestLengthBucketScheduler(unittest.TestCase):
+    def test_schedule(self):
+        items = ["a", "a b c d e f", "b", "c", "a b c d e g", "d"]
+        scheduler = LengthBucketScheduler(bucket_bounds=(2,), batch_size=2, max_wait=None)
+        batches = list(scheduler.schedule(items, lambda item: len(item.split())))
+        self.assertEqual([[index for index, _ in batch] for batch in batches], [[0, 2], [1, 4], [3, 5]])
+        self.assertEqual(scheduler.stats(), {"batches": 3, "items": 6, "padding_waste": 0.0, "batch_fill": 1.0})
+        # Too many buffered items dispatch the bucket with the oldest item
+        scheduler = LengthBucketScheduler(bucket_bounds=(2,), batch_size=4, max_wait=None, max_pending=3)
+        batches = list(scheduler.schedule(items, lambda item: len(item.split())))
+        self.assertEqual([[index for index, _ in batch] for batch in batches], [[0, 2], [1, 4], [3, 5]])
+
+    def test_max_wait_stalled_stream(self):
+        def stream():
+            yield "a"
+            time.sleep(1)
+            yield "b"
+
+        scheduler = LengthBucketScheduler(bucket_bounds=(2,), batch_size=4, max_wait=0.05)
+        start = time.perf_counter()
+        batches = scheduler.schedule(stream(), lambda item: len(item.split()))
+        # The buffered item is dispatched while the stream stalls
+        self.assertEqual(next(batches), [(0, "a")])
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(list(batches), [[(1, "b")]])
+
+
+class TestProvenance(unittest.TestCase):
+    def test_replay(self):
+        record = Provenance(
+            "punct_camo", (False, True, False, "es", 2), "vacuna", "vac#u#na", rng_type="seed", rng_key=40
+        )
+        self.assertEqual(record["n_inj"], 2)
+        self.assertEqual(replay(record), "vac#u#na")
+        record = Provenance("inv_camo", ("es", 1, True), "vacuna", "cuvana")
+        with self.assertRaises(RuntimeError):
+            replay(record)
+
+
+class TestTfidfExtractor(unittest.TestCase):
+    corpus = [
+        "The covid vaccine is a lie from the pharma industry",
+        "The pharma industry sells the vaccine",
+        "covid covid everywhere",
+    ]
+
+    def test_extract_keywords(self):
+        extractor = TfidfExtractor().fit(self.corpus)
+        stop_words = StopWords(["the", "is", "from"])
+        res = extractor.extract_keywords(
+            self.corpus + ["unknown words"], [2, 1, 1, 3], stop_words=stop_words
+        )
+        self.assertEqual([[kw for kw, _ in kws] for kws in res], [["lie", "covid"], ["sells"], ["covid"], []])
+
+    def test_save_load(self):
+        extractor = TfidfExtractor(ngram_range=(1, 2)).fit(self.corpus)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "tfidf.json")
+            extractor.save(path)
+            loaded = TfidfExtractor.load(path)
+        self.assertEqual(
+            loaded.extract_keywords(self.corpus, 3, keyphrase_ngram_range=(1, 2)),
+            extractor.extract_keywords(self.corpus, 3, keyphrase_ngram_range=(1, 2)),
+        )
+        with self.assertRaises(RuntimeError):
+            TfidfExtractor().extract_keywords(self.corpus)
+
+        # All the parameters of the vectorizer are restored, so the weights do not change
+        extractor = TfidfExtractor(
+            ngram_range=(1, 2),
+            smooth_idf=False,
+            sublinear_tf=True,
+            stop_words=["the", "is"],
+            min_df=1,
+            max_df=0.9,
+            norm="l1",
+            dtype=np.float32,
+        ).fit(self.corpus)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "tfidf.json")
+            extractor.save(path)
+            loaded = TfidfExtractor.load(path)
+        self.assertEqual(
+            loaded.vectorizer.get_params(), dict(extractor.vectorizer.get_params(), vocabulary=loaded.vectorizer.vocabulary)
+        )
+        self.assertEqual(loaded.vectorizer.vocabulary_, extractor.vectorizer.vocabulary_)
+        np.testing.assert_array_equal(
+            loaded.vectorizer.transform(self.corpus).toarray(), extractor.vectorizer.transform(self.corpus).toarray()
+        )
+        self.assertEqual(loaded.extract_keywords(self.corpus, 3), extractor.extract_keywords(self.corpus, 3))
+
+
+class TestAsyncAugmenter(unittest.TestCase):
+    sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(40)]
+
+    def new_augmenter(self):
+        return WordCamouflage_Augmenter.augmenter(
+            extractor_type="tfidf", seed=21, rng_type="philox"
+        ).fit_tfidf(self.sentences)
+
+    def test_micro_batches(self):
+        res = self.new_augmenter().transform_batch(self.sentences, stop_words=["the", "is"])
+
+        async def run():
+            async with AsyncAugmenter(self.new_augmenter(), max_batch_size=16) as aug:
+                return await aug.transform_many_async(self.sentences, stop_words=["the", "is"])
+
+        self.assertEqual(asyncio.run(run()), res)
+
+    def test_timeout(self):
+        async def run():
+            async with AsyncAugmenter(self.new_augmenter()) as aug:
+                await aug.transform_async(self.sentences[0], timeout=0)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+    def test_timeout_deadline(self):
+        # The timeout covers both the wait for room in the queue and the wait for the output
+        class SlowAugmenter(object):
+            def transform_batch(self, sentences, batch_size=None):
+                time.sleep(0.4)
+                return sentences
+
+        async def run():
+            async with AsyncAugmenter(SlowAugmenter(), max_batch_size=1, max_delay=0, max_pending=1) as aug:
+                requests = [asyncio.ensure_future(aug.transform_async(sentence)) for sentence in self.sentences[:2]]
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                with self.assertRaises(asyncio.TimeoutError):
+                    await aug.transform_async(self.sentences[2], timeout=0.5)
+                elapsed = time.perf_counter() - start
+                await asyncio.gather(*requests)
+                return elapsed
+
+        self.assertLess(asyncio.run(run()), 0.75)
+
+    def test_inline(self):
+        res = LeetSpeaker(mode="basic", seed=21).text2leet("vacuna")
+        aug = AsyncAugmenter(LeetSpeaker(mode="basic", seed=21))
+        self.assertTrue(aug.inline)
+        self.assertEqual(asyncio.run(aug.transform_async("vacuna")), res)
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        args = serve.get_parser().parse_args(["--port", "0", "--extractor", "random", "--seed", "21", "--quiet"])
+        self.server = serve.build_server(args)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post(self, path, data):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.server.server_port}{path}", json.dumps(data).encode("utf-8")
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_endpoints(self):
+        status, res = self.post("/leet", {"text": "vacuna", "mode": "basic"})
+        self.assertEqual(status, 200)
+        self.assertIsInstance(res["result"], str)
+        status, res = self.post("/augment", {"texts": ["The covid vaccine is a lie"] * 3, "stop_words": ["the", "is"]})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(res["results"]), 3)
+
+    def test_errors(self):
+        self.assertEqual(self.post("/ner", {"text": "vacuna"})[0], 404)
+        self.assertEqual(self.post("/leet", {"texts": "vacuna"})[0], 400)
+        self.assertEqual(self.post("/leet", {"text": "vacuna", "lang": "es"})[0], 400)
+
+    def test_ner_without_keybert_augmenter(self):
+        # The YAKE augmenter has no KeyBERT model to share with the NER generator
+        args = serve.get_parser().parse_args(
+            ["--port", "0", "--extractor", "yake", "--ner", "--kw-model-name", "hashing", "--quiet"]
+        )
+        server = serve.build_server(args)
+        self.assertEqual(server.endpoints(), ["/leet", "/augment", "/ner"])
+        server.server_close()
+
+
+class TestCli(unittest.TestCase):
+    def run_cli(self, argv, lines):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "input.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(cli.main(argv + [path]), 0)
+        return output.getvalue().splitlines()
+
+    def test_leet_workers(self):
+        lines = [f"The covid vaccine number {i} is a lie" for i in range(20)]
+        res = self.run_cli(["leet", "--seed", "21", "--mode", "covid_basic", "--batch-size", "3"], lines)
+        self.assertEqual(len(res), len(lines))
+        # The random state of each line depends only on the seed and the line number
+        res_workers = self.run_cli(["leet", "--seed", "21", "--mode", "covid_basic", "--workers", "2"], lines)
+        self.assertEqual(res_workers, res)
+
+    def test_augment_empty_lines(self):
+        lines = ["The covid vaccine is a lie", "", "The pharma industry lies"]
+        res = self.run_cli(
+            ["augment", "--extractor", "random", "--stop-words", "the,is", "--seed", "21"], lines
+        )
+        self.assertEqual(len(res), 3)
+        self.assertEqual(res[1], "")
+
+    def test_augment_mode(self):
+        # --mode selects the camouflage techniques of the keywords
+        args = cli.get_parser().parse_args(["augment", "--extractor", "random", "--mode", "basic_leetspeak,punct_camo"])
+        self.assertEqual(cli.build_augment(args).method, ["basic_leetspeak", "punct_camo"])
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            cli.get_parser().parse_args(["augment", "--mode", "basic"])
+
+    def test_mode_ignored(self):
+        # All the subcommands accept --mode, the subcommands without modes ignore it
+        lines = [f"The covid vaccine number {i} is a lie" for i in range(5)]
+        for command in ["punct", "invert"]:
+            res = self.run_cli([command, "--seed", "21"], lines)
+            self.assertEqual(self.run_cli([command, "--seed", "21", "--mode", "covid_basic"], lines), res)
+        self.assertEqual(cli.get_parser().parse_args(["ner", "--mode", "covid_basic"]).mode, "covid_basic")
+
+    def test_bilou(self):
+        record = {"leet_sentence": "The c0v1d vaccine", "entities": [[4, 9, "LEETSPEAK"]]}
+        res = self.run_cli(["bilou", "--mode", "biluo"], [json.dumps(record)])
+        self.assertEqual(res, ["0\tThe\tO", "0\tc0v1d\tU-LEETSPEAK", "0\tvaccine\tO"])
+
+
 class TestText2Augmenter(unittest.TestCase):
     def test_Augmenter(self):
         text = "vacuna"
@@ -221,5 +793,287 @@ class TestText2Augmenter(unittest.TestCase):
         )
 
 
+    def test_Augmenter_batch(self):
+        sentences = [
+            "Vaccines are not a plandemic",
+            "The covid vaccine is here",
+            "Stay at home",
+        ]
+        kwargs = dict(
+            extractor_type="random", max_top_n=5, lang="en", leet_punt_prb=0.9
+        )
+        stop_words = ["the", "is", "at", "are", "a"]
+        sequential = WordCamouflage_Augmenter.augmenter(seed=21, **kwargs)
+        expected = [sequential.transform(s, stop_words=stop_words) for s in sentences]
+
+        # Batches of one sentence draw the random numbers in the same order
+        batched = WordCamouflage_Augmenter.augmenter(seed=21, **kwargs)
+        res = batched.transform_batch(sentences, stop_words=stop_words, batch_size=1)
+        self.assertEqual(res, expected)
+
+        batched = WordCamouflage_Augmenter.augmenter(seed=21, **kwargs)
+        res = batched.transform_batch(sentences, stop_words=stop_words, batch_size=2)
+        self.assertEqual(len(res), len(sentences))
+
+    def test_Augmenter_parallel(self):
+        sentences = [f"The covid vaccine number {i} is here" for i in range(20)]
+        stop_words = ["the", "is"]
+        res_1 = list(
+            WordCamouflage_Augmenter.augmenter(
+                extractor_type="random", seed=21
+            ).transform_parallel(sentences, n_workers=1, stop_words=stop_words)
+        )
+        aug = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21)
+        res_3 = list(
+            aug.transform_parallel(sentences, n_workers=3, chunksize=2, stop_words=stop_words)
+        )
+        # The output does not depend on the number of workers
+        self.assertEqual(res_1, res_3)
+        # Any record can be reproduced independently
+        self.assertEqual(aug.transform_record(sentences[7], 7, stop_words=stop_words), res_1[7])
+
+        # Also with the pooled transformers of fast_sampling
+        res = [
+            list(
+                WordCamouflage_Augmenter.augmenter(
+                    extractor_type="random", seed=21, fast_sampling=True
+                ).transform_parallel(sentences, n_workers=n_workers, chunksize=2, stop_words=stop_words)
+            )
+            for n_workers in [1, 2, 3]
+        ]
+        self.assertEqual(res[0], res[1])
+        self.assertEqual(res[0], res[2])
+        aug = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21, fast_sampling=True)
+        self.assertEqual(aug.transform_record(sentences[7], 7, stop_words=stop_words), res[0][7])
+
+        # Processing a corpus in the current process does not change the sequence of later `transform` calls
+        for kwargs in [{}, {"fast_sampling": True}, {"rng_type": "philox"}]:
+            expected = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21, **kwargs)
+            expected = [expected.transform(sentence, stop_words=stop_words) for sentence in sentences[:4]]
+            aug = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21, **kwargs)
+            res = [aug.transform(sentence, stop_words=stop_words) for sentence in sentences[:2]]
+            list(aug.transform_parallel(sentences, n_workers=1, stop_words=stop_words))
+            res += [aug.transform(sentence, stop_words=stop_words) for sentence in sentences[2:4]]
+            self.assertEqual(res, expected)
+
+    def test_Augmenter_philox(self):
+        sentences = [f"The covid vaccine number {i} is here" for i in range(10)]
+        stop_words = ["the", "is"]
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox"
+        )
+        res = [
+            aug.transform(sentence, stop_words=stop_words, sentence_id=i)
+            for i, sentence in enumerate(sentences)
+        ]
+        # Each sentence is reproduced alone, in any order and in batches
+        self.assertEqual(
+            aug.transform(sentences[7], stop_words=stop_words, sentence_id=7), res[7]
+        )
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox"
+        )
+        self.assertEqual(aug.transform_batch(sentences, stop_words=stop_words, batch_size=3), res)
+        with self.assertRaises(RuntimeError):
+            WordCamouflage_Augmenter.augmenter(extractor_type="random", rng_type="mt")
+        # Sentence ids and keyword indexes that do not fit in the Philox key are rejected
+        with self.assertRaises(RuntimeError):
+            aug.transform(sentences[0], stop_words=stop_words, sentence_id=2**39)
+        with self.assertRaises(RuntimeError):
+            aug.technique_key(0, 2**16, "method")
+
+    def test_Augmenter_transformer_pool(self):
+        # The pooled transformers get the generator of each keyword in the call, it is not stored on them
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(10)]
+        aug = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21, rng_type="philox")
+        res = aug.transform_batch(sentences, stop_words=["the", "is"])
+        rngs = {key: transformer.rng for key, transformer in aug.transformer_pool.items()}
+        random.seed(5)
+        state = random.getstate()
+        aug.sentence_counter = 0
+        self.assertEqual(aug.transform_batch(sentences, stop_words=["the", "is"]), res)
+        self.assertEqual({key: transformer.rng for key, transformer in aug.transformer_pool.items()}, rngs)
+        # Philox keywords never touch the global random state
+        self.assertEqual(random.getstate(), state)
+
+    def test_Augmenter_fast_sampling(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(10)]
+        res = [
+            WordCamouflage_Augmenter.augmenter(
+                extractor_type="random", seed=21, fast_sampling=True
+            ).transform_batch(sentences, stop_words=["the", "is"])
+            for _ in range(2)
+        ]
+        self.assertEqual(res[0], res[1])
+
+    def test_Augmenter_replay(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(10)]
+        for rng_type in ["legacy", "philox"]:
+            aug = WordCamouflage_Augmenter.augmenter(
+                extractor_type="random", seed=21, rng_type=rng_type, return_kws=True
+            )
+            for leet_sentence, ori_data in aug.transform_batch(sentences, stop_words=["the", "is"]):
+                for meta in ori_data["meta"]:
+                    for record in meta["params"].values():
+                        self.assertEqual(replay(record), record.text_out)
+
+    def test_Augmenter_variant_pool(self):
+        sentences = ["The covid vaccine is a lie from the pharma industry"] * 20
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox", variant_pool_size=4
+        )
+        res = aug.transform_batch(sentences, stop_words=["the", "is"])
+        self.assertGreater(aug.variant_pool.stats()["hits"], 0)
+        self.assertEqual(
+            res,
+            WordCamouflage_Augmenter.augmenter(
+                extractor_type="random", seed=21, rng_type="philox", variant_pool_size=4
+            ).transform_batch(sentences, stop_words=["the", "is"]),
+        )
+
+    def test_Augmenter_tfidf(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(10)]
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="tfidf", seed=21
+        ).fit_tfidf(sentences)
+        res = aug.transform_batch(sentences, stop_words=["the", "is"])
+        self.assertEqual(len(res), 10)
+        with self.assertRaises(RuntimeError):
+            WordCamouflage_Augmenter.augmenter(extractor_type="tfidf").transform(
+                sentences[0], stop_words=["the", "is"]
+            )
+
+    def test_Augmenter_yake_workers(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(10)]
+        res = [
+            WordCamouflage_Augmenter.augmenter(
+                extractor_type="yake", seed=21, rng_type="philox", yake_workers=n_workers
+            ).transform_batch(sentences, stop_words=["the", "is"])
+            for n_workers in [0, 2]
+        ]
+        self.assertEqual(res[0], res[1])
+
+    def test_Augmenter_length_buckets(self):
+        sentences = [
+            "The covid vaccine " + "is a lie from the pharma industry " * (i % 4) for i in range(20)
+        ]
+        res = [
+            WordCamouflage_Augmenter.augmenter(
+                extractor_type="random", seed=21, rng_type="philox"
+            ).transform_batch(sentences, stop_words=["the", "is"], batch_size=4, bucket_bounds=bucket_bounds)
+            for bucket_bounds in [None, (4, 12)]
+        ]
+        self.assertEqual(res[0], res[1])
+
+    @unittest.skipUnless(
+        WordCamouflage_Augmenter.keybert_precomputed_embeddings, "keybert<0.7.0 has no precomputed embeddings"
+    )
+    def test_Augmenter_embedding_cache(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(8)]
+        res = WordCamouflage_Augmenter.augmenter(
+            extractor_type="keybert", kw_model_name="hashing", seed=21, rng_type="philox"
+        ).transform_batch(sentences, stop_words=["the", "is"], batch_size=4)
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="keybert", kw_model_name="hashing", seed=21, rng_type="philox", embedding_cache=1000
+        )
+        self.assertEqual(aug.transform_batch(sentences, stop_words=["the", "is"], batch_size=4), res)
+        # The candidate words repeated between batches are embedded once
+        stats = aug.embedding_cache.stats()
+        self.assertGreater(stats["hits"], 0)
+        self.assertEqual(stats["misses"], stats["size"])
+
+    def test_Augmenter_deduplicate_keywords(self):
+        # Duplicated keywords are removed keeping the extraction order, whatever the hash seed of the process
+        aug = WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21)
+        kws = [("vaccine", 0.9), ("pharma", 0.8), ("covid", 0.7), ("vaccine", 0.9), ("lie", 0.6)]
+        self.assertEqual(
+            aug.add_important_kws("The covid vaccine is a lie", kws, None),
+            ["vaccine", "pharma", "covid", "lie"],
+        )
+
+    def test_Augmenter_keybert_empty_batch(self):
+        # A batch without candidate keywords must keep all its sentences
+        sentences = ["the a an", "of the", "vaccines are great for covid patients"]
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="keybert", kw_model_name="hashing", seed=21
+        )
+        res = aug.transform_batch(sentences, stop_words=["the", "a", "of", "an"], batch_size=2)
+        self.assertEqual(len(res), 3)
+        self.assertEqual(res[:2], sentences[:2])
+
+    def test_Augmenter_hashing_embedder(self):
+        sentence = "The covid vaccine number 1 is a lie from the pharma industry"
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="keybert", kw_model_name="hashing", seed=21
+        )
+        self.assertEqual(
+            [kw for kw, _ in aug.kw_model.extract_keywords(sentence, stop_words=["the", "is"], top_n=2)],
+            ["industry", "vaccine"],
+        )
+        # Any function that embeds a list of texts can be the embedding backend
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="keybert",
+            kw_model_name=lambda texts: np.array([[len(text), 1.0] for text in texts]),
+            seed=21,
+        )
+        self.assertEqual(len(aug.kw_model.extract_keywords(sentence, stop_words=["the", "is"], top_n=2)), 2)
+
+    def test_Augmenter_pipelined(self):
+        sentences = [f"The covid vaccine number {i} is a lie from the pharma industry" for i in range(50)]
+        res = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox"
+        ).transform_batch(sentences, stop_words=["the", "is"], batch_size=4)
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox"
+        )
+        outputs = aug.transform_pipelined(
+            iter(sentences), stop_words=["the", "is"], batch_size=4, queue_size=2, extract_workers=2
+        )
+        self.assertEqual(list(outputs), res)
+
+        # Several extraction threads give the same results in every run
+        runs = [
+            list(
+                WordCamouflage_Augmenter.augmenter(
+                    extractor_type="random", seed=21, rng_type="philox"
+                ).transform_pipelined(iter(sentences), stop_words=["the", "is"], batch_size=2, extract_workers=4)
+            )
+            for _ in range(2)
+        ]
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(runs[0], res)
+        # The legacy random state can not be shared by several extraction threads
+        with self.assertRaises(RuntimeError):
+            WordCamouflage_Augmenter.augmenter(extractor_type="random", seed=21).transform_pipelined(
+                iter(sentences), stop_words=["the", "is"], extract_workers=4
+            )
+
+        # Closing the pipeline early does not wait for a stalled input
+        def stream():
+            yield from sentences[:4]
+            time.sleep(2)
+            yield from sentences[4:]
+
+        outputs = aug.transform_pipelined(stream(), stop_words=["the", "is"], batch_size=4)
+        next(outputs)
+        start = time.perf_counter()
+        outputs.close()
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_Augmenter_n_variants(self):
+        sentence = "The covid vaccine is a lie from the pharma industry"
+        aug = WordCamouflage_Augmenter.augmenter(
+            extractor_type="random", seed=21, rng_type="philox"
+        )
+        res = aug.transform(sentence, stop_words=["the", "is"], sentence_id=3, n_variants=3)
+        self.assertEqual(len(res), 3)
+        # The first variant is the camouflaged sentence without variants
+        self.assertEqual(res[0], aug.transform(sentence, stop_words=["the", "is"], sentence_id=3))
+        variants = aug.transform(
+            sentence, stop_words=["the", "is"], sentence_id=3, n_variants=3, stream=True
+        )
+        self.assertEqual(list(variants), res)
+
+
 if "__main__" == __name__:
     unittest.main()